@@ -2,6 +2,15 @@ import requests
 import pandas as pd
 import time
 import re
+import os
+
+try:
+    import storage
+except ModuleNotFoundError as e:
+    if e.name != "storage":
+        raise
+    raise ModuleNotFoundError("fundamentals shares nlp/storage.py with the NLP stages; "
+                              "run it with PYTHONPATH=nlp (see README)", name=e.name) from e
 
 OUT_PATH = "data/processed/ipo_fundamentals_basic.csv"
 
@@ -81,7 +90,8 @@ def fuzzy_match(ipo_name: str, nse_names: list) -> str | None:
 def main():
     # Load your IPO names
     try:
-        sentiment_df = pd.read_csv("data/processed/ipo_sentiment_summary.csv")
+        sentiment_df = storage.read_table("data/processed/ipo_sentiment_summary.csv",
+                                          columns=["ipo_name"])
         IPO_LIST = sentiment_df["ipo_name"].dropna().unique().tolist()
         print(f"Loaded {len(IPO_LIST)} IPOs from sentiment summary")
     except FileNotFoundError:
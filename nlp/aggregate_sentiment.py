@@ -1,131 +1,24 @@
 import pandas as pd
+import numpy as np
+import argparse
+import re
 from rapidfuzz import process, fuzz
 
+import storage
+from ipo_terms import JUNK_NAMES, MANUAL_NORMALIZE
+from manifest import Manifest
+from parallel import add_workers_arg
+
 INPUT_PATH   = "data/processed/ipo_sentiment_scored.csv"
 SUMMARY_PATH = "data/processed/ipo_sentiment_summary.csv"
 TREND_PATH   = "data/processed/ipo_sentiment_trend.csv"
 
-# ── Known junk names to drop before anything else ────────────────────────────
-JUNK_NAMES = {
-    "upcoming", "mainboard", "sme", "big", "new", "check", "total",
-    "record", "india", "crore", "cr", "million", "billion", "only",
-    "from", "six", "nine", "four", "which", "the", "about", "where",
-    "what", "why", "each", "click", "latest", "average", "korean",
-    "rebounding", "rs", "sebi", "bse", "nse", "drhp", "gmp", "all",
-    "top", "best", "key", "major", "five", "three", "two", "ten",
-    "how", "when", "first", "last", "this", "that", "more", "most",
-    "here", "there", "into", "over", "under", "after", "before",
-    "amid", "versus", "vs", "per", "via", "and", "for", "with",
-    "plans", "proposed", "christmas", "dual", "steel", "market",
-    "revenue cagr post", "research centre", "industries", "healthcare",
-    "historic", "download", "current", "global", "infra", "hour",
-    "live", "open", "bold", "mixed", "these", "year", "ipos",
-    "groundbreaking", "gleaming", "landmark", "firms eye",
-    "stock brokers", "anchor investors back clean max",
-    "fashion player kiaasa retail submits",
-    "player pngs reva diamond jewellery",
-    "in yaap digital ahead of",
-    "ambani says targeting reliance jio",
-    "reliance jio targets massive",
-    "is shree ram twistex",
-    "gaudium ivf announce",
-    "pngs reva diamond jewellery files",
-    "pngs reva diamond jewellery launches",
-    "max & pngs reva diamond",
-    "cleanmax enviro energy solutions limited",
-    "does clean max enviro energy",
-}
-
-# ── Manual canonical names (always prefer these over fuzzy guesses) ───────────
-MANUAL_NORMALIZE = {
-    # CleanMax variants
-    "Clean Max":                          "CleanMax Enviro Energy",
-    "Clean Max Enviro":                   "CleanMax Enviro Energy",
-    "Clean Max Enviro Energy":            "CleanMax Enviro Energy",
-    "Clean Max Enviro Energy Solutions":  "CleanMax Enviro Energy",
-    "CleanMax":                           "CleanMax Enviro Energy",
-    "CleanMax Enviro":                    "CleanMax Enviro Energy",
-    "Cleanmax":                           "CleanMax Enviro Energy",
-    "Max Enviro Energy Solutions Ltd":    "CleanMax Enviro Energy",
-
-    # YAAP Digital variants
-    "YAAP Digital":                       "Yaap Digital",
-    "YAAP DIGITAL LIMITED":               "Yaap Digital",
-
-    # PNGS Reva variants
-    "PNGS Reva":                          "PNGS Reva Diamond Jewellery",
-    "PNGS Reva Diamond":                  "PNGS Reva Diamond Jewellery",
-    "PNGS Reva Jewellery":               "PNGS Reva Diamond Jewellery",
-    "Reva Diamond":                       "PNGS Reva Diamond Jewellery",
-    "Reva Diamond Jewellery":            "PNGS Reva Diamond Jewellery",
-    "Reva Diamonds":                      "PNGS Reva Diamond Jewellery",
-    "Reva Diamonds Files":               "PNGS Reva Diamond Jewellery",
-    "Reva Jewellery":                     "PNGS Reva Diamond Jewellery",
-
-    # Omnitech
-    "Omnitech":                           "Omnitech Engineering",
-
-    # Gaudium IVF variants
-    "Gaudium":                            "Gaudium IVF",
-    "Gaudium IVF & Women Health":         "Gaudium IVF",
-
-    # Striders Impex
-    "Striders Impex Limited":             "Striders Impex",
-
-    # Accord Transformer
-    "Accord Transformer & Switchgear":    "Accord Transformer",
-
-    # Fractal Analytics
-    "Fractal AI":                         "Fractal Analytics",
-    "Fractal Industries":                 "Fractal Analytics",
-
-    # Shree Ram Twistex
-    "Shree Ram":                          "Shree Ram Twistex",
-
-    # PhonePe
-    "PhonePe Files Draft":                "PhonePe",
-    "Backed PhonePe":                     "PhonePe",
-
-    # Mobilise App
-    "Mobilise App":                       "Mobilise App Lab",
-    "Mobilise App Lab Limited":           "Mobilise App Lab",
-
-    # Women Health
-    "Women Health":                       "Gaudium IVF",
-
-    # ICICI Prudential AMC
-    "ICICI Pru AMC":                      "ICICI Prudential AMC",
-
-    # SBI
-    "SBI Mutual Fund":                    "SBI Funds Management",
-
-    # HDB Financial
-    "HDB Financial":                      "HDB Financial Services",
-
-    # Wakefit
-    "Wakefit Innovations":                "Wakefit",
-
-    # E Transportation
-    "E Transportation":                   "E To E Transportation Infrastructure",
-
-    # National Stock Exchange
-    "National Stock Exchange":            "NSE",
-
-    # Solarworld
-    "Solarworld Energy Solutions":        "Solarworld Energy",
-
-    # Studds
-    "Studds":                             "Studds Accessories",
-
-    # Bonfiglioli
-    "Bonfiglioli Transmissions Limited":  "Bonfiglioli Transmissions",
-
-    # Pride Hotels
-    "Pride Hotels Limited":               "Pride Hotels",
-
-    # Narmadesh
-    "Narmadesh Brass":                    "Narmadesh Brass Industries",
-}
+DATE_COLUMNS = ["published_date", "date", "published", "pubDate"]
+# Only these are read from the scored file — article text never leaves disk
+INPUT_COLUMNS = ["ipo_name", "sentiment_score", "sentiment_label"] + DATE_COLUMNS
+
+FUZZY_THRESHOLD = 88
+FUZZY_CHUNK     = 256   # query names per similarity-matrix block
 
 
 def apply_manual_normalize(name: str) -> str:
@@ -184,6 +77,94 @@ def fuzzy_deduplicate(names: list, threshold: int = 88) -> dict:
     return canonical_map
 
 
+# ── Blocked fuzzy clustering ─────────────────────────────────────────────────
+# Same canonical map as fuzzy_deduplicate(), without comparing every name to
+# every earlier one. token_sort_ratio is ratio() of the sorted tokens, so each
+# name is tokenised once. ratio = 200·LCS / (l1 + l2) can only reach the
+# threshold when the shorter string is at least t / (200 − t) of the longer,
+# so each block of queries (in length order) is scored against one contiguous
+# length window with a vectorised cdist.
+#
+# rapidfuzz's token separators are not str.split()'s: \x85 and \xa0 split in
+# its pure-Python scorer, but in the C++ one only inside strings that also
+# hold a character past U+00FF. So only names whose whitespace is plain
+# spaces are pre-tokenised; any pair involving another whitespace character
+# is scored with token_sort_ratio itself.
+
+_ODD_SPACE = re.compile(r"[^\S ]")   # whitespace other than " "
+
+
+def _sorted_tokens(name: str) -> str:
+    return " ".join(sorted(name.split()))
+
+
+def _best_earlier(rows: np.ndarray, cols: np.ndarray, score: np.ndarray,
+                  threshold: float, n: int) -> np.ndarray:
+    """extractOne() semantics: highest score among earlier keys, first key on ties (n = none)."""
+    valid = (cols[None, :] < rows[:, None]) & (score >= threshold)
+    score = np.where(valid, score, -1.0)
+    best  = score.max(axis=1, initial=-1.0)
+    ties  = valid & (score == best[:, None])
+    return np.where(ties, cols[None, :], n).min(axis=1, initial=n)
+
+
+def fuzzy_deduplicate_blocked(names: list, threshold: float = FUZZY_THRESHOLD,
+                              chunk: int = FUZZY_CHUNK, workers: int = 1) -> dict:
+    """fuzzy_deduplicate(names, threshold), in roughly linear time for spread-out lengths."""
+    # Distinct lowercase keys in the order fuzzy_deduplicate() assigns them
+    first = {}
+    for name in sorted(names, key=lambda x: len(x)):
+        first.setdefault(name.lower(), name)
+    keys = list(first)
+    n    = len(keys)
+
+    is_odd = np.array([_ODD_SPACE.search(k) is not None for k in keys], dtype=bool)
+    plain  = np.flatnonzero(~is_odd)
+    odd    = np.flatnonzero(is_odd)
+    odd_keys = [keys[j] for j in odd]
+
+    tokens  = [_sorted_tokens(k) for k in keys]
+    lengths = np.array([len(tokens[i]) for i in plain], dtype=np.int64)
+    order   = np.argsort(lengths, kind="stable")
+    by_len  = plain[order]
+    sorted_lengths = lengths[order]
+
+    t      = min(max(threshold, 0), 100)
+    lo_f   = t / (200 - t)
+    hi_f   = (200 - t) / t if t > 0 else np.inf
+    parent = np.full(n, n)   # best earlier key (index into keys), n = none
+
+    for start in range(0, len(plain), chunk):
+        rows  = by_len[start:start + chunk]
+        lo    = np.searchsorted(sorted_lengths, sorted_lengths[start] * lo_f - 1, "left")
+        hi    = np.searchsorted(sorted_lengths,
+                                sorted_lengths[min(start + chunk, len(plain)) - 1] * hi_f + 1,
+                                "right")
+        cols  = by_len[lo:hi]
+        score = process.cdist([tokens[i] for i in rows], [tokens[j] for j in cols],
+                              scorer=fuzz.ratio, score_cutoff=t, dtype=np.float64,
+                              workers=workers)
+        if len(odd):
+            cols  = np.concatenate([cols, odd])
+            score = np.hstack([score, process.cdist(
+                [keys[i] for i in rows], odd_keys, scorer=fuzz.token_sort_ratio,
+                score_cutoff=t, dtype=np.float64, workers=workers)])
+        parent[rows] = _best_earlier(rows, cols, score, threshold, n)
+
+    # Names with other whitespace: the real scorer against every key
+    for start in range(0, len(odd), chunk):
+        rows  = odd[start:start + chunk]
+        score = process.cdist([keys[i] for i in rows], keys, scorer=fuzz.token_sort_ratio,
+                              score_cutoff=t, dtype=np.float64, workers=workers)
+        parent[rows] = _best_earlier(rows, np.arange(n), score, threshold, n)
+
+    canonical = []
+    for i, key in enumerate(keys):
+        canonical.append(canonical[parent[i]] if parent[i] < n else first[key])
+    lookup = dict(zip(keys, canonical))
+    return {name: lookup[name.lower()] for name in names}
+
+
 def signal(score: float) -> str:
     if score >= 0.05:
         return "BULLISH"
@@ -194,7 +175,22 @@ def signal(score: float) -> str:
 
 
 def main():
-    df = pd.read_csv(INPUT_PATH)
+    parser = argparse.ArgumentParser(description="Aggregate scored articles per IPO")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip if the scored input is unchanged since the last run")
+    parser.add_argument("--legacy-fuzzy", action="store_true",
+                        help="cluster names with the original all-pairs fuzzy_deduplicate()")
+    add_workers_arg(parser)
+    args = storage.add_format_arg(parser).parse_args()
+    storage.use(args.format)
+
+    manifest = Manifest()
+    if (args.incremental and storage.exists(SUMMARY_PATH)
+            and manifest.input_unchanged("aggregate_sentiment", INPUT_PATH)):
+        print(f"{INPUT_PATH} unchanged since the last run — nothing to do")
+        return
+
+    df = storage.read_table(INPUT_PATH, columns=INPUT_COLUMNS)
     print(f"Loaded {len(df)} scored articles")
 
     # ── Step 1: Apply manual normalization ───────────────────────────────────
@@ -209,7 +205,11 @@ def main():
     unique_names = df["ipo_name"].dropna().unique().tolist()
     print(f"Unique names before fuzzy: {len(unique_names)}")
 
-    fuzzy_map = fuzzy_deduplicate(unique_names, threshold=88)
+    if args.legacy_fuzzy:
+        fuzzy_map = fuzzy_deduplicate(unique_names, threshold=FUZZY_THRESHOLD)
+    else:
+        fuzzy_map = fuzzy_deduplicate_blocked(unique_names, FUZZY_THRESHOLD,
+                                              workers=args.workers)
     df["ipo_name"] = df["ipo_name"].map(fuzzy_map).fillna(df["ipo_name"])
 
     unique_after = df["ipo_name"].nunique()
@@ -217,7 +217,7 @@ def main():
 
     # ── Step 4: Parse date ────────────────────────────────────────────────────
     date_col = None
-    for col in ["published_date", "date", "published", "pubDate"]:
+    for col in DATE_COLUMNS:
         if col in df.columns:
             df[col] = pd.to_datetime(df[col], errors="coerce")
             date_col = col
@@ -239,8 +239,8 @@ def main():
     summary["negative_ratio"]      = (summary["negative_count"] / summary["article_count"]).round(4)
     summary["signal"]              = summary["avg_sentiment_score"].apply(signal)
 
-    summary.to_csv(SUMMARY_PATH, index=False)
-    print(f"\n✅ Per-IPO summary saved → {SUMMARY_PATH}")
+    saved = storage.write_table(summary, SUMMARY_PATH)
+    print(f"\n✅ Per-IPO summary saved → {saved}")
     print(summary[["ipo_name", "article_count", "avg_sentiment_score", "signal"]].to_string(index=False))
 
     # ── Step 6: Sentiment trend ───────────────────────────────────────────────
@@ -251,11 +251,14 @@ def main():
             article_count = ("sentiment_score", "count"),
         ).reset_index()
         trend["avg_sentiment"] = trend["avg_sentiment"].round(4)
-        trend.to_csv(TREND_PATH, index=False)
-        print(f"✅ Sentiment trend saved → {TREND_PATH}")
+        saved = storage.write_table(trend, TREND_PATH)
+        print(f"✅ Sentiment trend saved → {saved}")
     else:
         print("⚠️  No date column found — skipping trend output.")
 
+    manifest.record_input("aggregate_sentiment", INPUT_PATH)
+    manifest.save()
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,74 +1,98 @@
 import pandas as pd
+import argparse
 import re
 import os
 import glob
 from nltk.corpus import stopwords
 import nltk
+import numpy as np
+
+import storage
+from manifest import Manifest, row_hashes, text_digest
+from near_dup import (NEAR_DUP_THRESHOLD, NUM_PERM, cluster_signatures, load_signatures,
+                      save_signatures, signatures)
+from parallel import add_workers_arg, parallel_map
 
 nltk.download("stopwords", quiet=True)
 
 STOPWORDS = set(stopwords.words("english"))
 
-RAW_DIR  = "data/raw"
-OUT_PATH = "data/processed/all_news_clean.csv"
+RAW_DIR   = "data/raw"
+OUT_PATH  = "data/processed/all_news_clean.csv"
+SIG_CACHE = "data/cache/minhash_signatures.npz"   # signatures of kept rows, for --incremental
 
-os.makedirs("data/processed", exist_ok=True)
+# ── Precompiled cleaning patterns ─────────────────────────────────────────────
+_URL_RE   = re.compile(r"http\S+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")   # what survives the char filter, split on whitespace
 
-files = glob.glob(os.path.join(RAW_DIR, "*.csv"))
-print("Raw files found:", files)
+WORD_CACHE_SIZE = 500_000   # distinct words remembered by clean_texts() before resetting
+CHUNK_ROWS      = 50_000    # rows per chunk in --stream mode
 
-dfs = []
 
-for f in files:
-    try:
-        if os.path.getsize(f) == 0:
-            print("Skipping empty file:", f)
-            continue
-
-        df = pd.read_csv(f)
-
-        if df.empty:
-            print("Skipping no-row file:", f)
-            continue
-
-        df["raw_file"] = os.path.basename(f)
-
-        # Force all columns to string-safe types
-        df = df.astype(object).where(df.notna(), other="")
-
-        # ── Pick the best text column available ──────────────────────────
-        # Priority: full_text > summary > text > title
-        if "full_text" in df.columns and df["full_text"].astype(str).str.len().mean() > 100:
-            df["text"] = df["full_text"]
-            print(f"  {os.path.basename(f)}: using full_text column")
-        elif "summary" in df.columns:
-            df["text"] = df["summary"]
-            print(f"  {os.path.basename(f)}: using summary column")
-        elif "text" not in df.columns and "title" in df.columns:
-            df["text"] = df["title"]
-            print(f"  {os.path.basename(f)}: using title column")
-        else:
-            print(f"  {os.path.basename(f)}: using text column")
+def pick_text_column(name: str, columns, mean_len) -> str:
+    """
+    Column whose contents become `text` for one raw file.
+    Priority: full_text (legacy Google News files) > text > summary > title.
+    `mean_len(col)` gives the mean string length of a column.
+    """
+    if "full_text" in columns and mean_len("full_text") > 100:
+        print(f"  {name}: using full_text column")
+        return "full_text"
+    elif "text" in columns and mean_len("text") > 0:
+        print(f"  {name}: using text column")
+        return "text"
+    elif "summary" in columns:
+        print(f"  {name}: using summary column")
+        return "summary"
+    elif "text" not in columns and "title" in columns:
+        print(f"  {name}: using title column")
+        return "title"
+    print(f"  {name}: using text column")
+    return "text"
+
+
+def raw_files() -> list:
+    files = glob.glob(os.path.join(RAW_DIR, "*.csv"))
+    print("Raw files found:", files)
+    return files
+
+
+def load_raw_files(files: list) -> list:
+    dfs = []
+
+    for f in files:
+        try:
+            if os.path.getsize(f) == 0:
+                print("Skipping empty file:", f)
+                continue
+
+            df = pd.read_csv(f)
+
+            if df.empty:
+                print("Skipping no-row file:", f)
+                continue
+
+            df["raw_file"] = os.path.basename(f)
 
-        dfs.append(df)
+            # Force all columns to string-safe types
+            df = df.astype(object).where(df.notna(), other="")
 
-    except Exception as e:
-        print("Skipping unreadable file:", f, "->", e)
+            # ── Pick the best text column available ──────────────────────
+            col = pick_text_column(os.path.basename(f), df.columns,
+                                   lambda c: df[c].astype(str).str.len().mean())
+            if col != "text":
+                df["text"] = df[col]
 
-if not dfs:
-    print("No files loaded. Exiting.")
-    exit()
+            dfs.append(df)
 
-all_df = pd.concat(dfs, ignore_index=True)
-print("Total raw rows loaded:", len(all_df))
+        except Exception as e:
+            print("Skipping unreadable file:", f, "->", e)
 
-# ── Deduplication ─────────────────────────────────────────────────────────────
-before = len(all_df)
-all_df = all_df.drop_duplicates(subset=["text"], keep="first")
-print(f"Dropped {before - len(all_df)} duplicate rows")
+    return dfs
 
 
 def clean_text(text):
+    """Reference single-row cleaner; clean_texts() must produce the same output."""
     if pd.isna(text):
         return ""
 
@@ -82,11 +106,382 @@ def clean_text(text):
     return " ".join(tokens)
 
 
-all_df["clean_text"] = all_df["text"].astype(str).apply(clean_text)
+def _clean_word(word: str) -> str:
+    """clean_text() for one whitespace-free chunk of text."""
+    return " ".join([t for t in _TOKEN_RE.findall(_URL_RE.sub("", word.lower()))
+                     if t not in STOPWORDS])
+
+
+def clean_texts(texts) -> list:
+    """
+    Batch version of clean_text() for a whole column; same output per row.
+
+    Every step of clean_text() works inside whitespace-delimited words
+    (`http\\S+` stops at whitespace, the char filter and stopwords are
+    per-token), so a row is the join of its cleaned words. News text
+    repeats the same words constantly, so each distinct word is cleaned
+    once and every later occurrence is a dict lookup.
+    """
+    cache = {}
+    get   = cache.get
+    out   = []
+
+    for text in texts:
+        if not isinstance(text, str):
+            if pd.isna(text):
+                out.append("")
+                continue
+            text = str(text)
+
+        words = text.split()
+        vals  = list(map(get, words))
+        if None in vals:
+            if len(cache) > WORD_CACHE_SIZE:
+                cache.clear()
+            for i, v in enumerate(vals):
+                if v is None:
+                    v = cache[words[i]] = _clean_word(words[i])
+                    vals[i] = v
+        out.append(" ".join(filter(None, vals)))
+
+    return out
+
+
+def finish_chunk(df: pd.DataFrame, workers: int = 1) -> pd.DataFrame:
+    if "row_hash" not in df.columns:
+        df["row_hash"] = row_hashes(df["text"].astype(str))
+    df["clean_text"] = parallel_map(clean_texts, df["text"].astype(str), workers)
+    return df[df["clean_text"].str.len() > 20]
+
+
+# ── Near-duplicate removal ────────────────────────────────────────────────────
+def drop_near_duplicates(df: pd.DataFrame, threshold: float, prior: tuple = None,
+                         workers: int = 1) -> tuple:
+    """
+    Keep the first copy of each syndicated story. dup_cluster_size on the
+    survivor records how many near-identical copies there were, and
+    dup_cluster_id is the survivor's row_hash.
+
+    `prior` is (row_hashes, sigs, valid) for rows kept by earlier runs; they
+    come first, so a new row copying one of them is dropped and counted in
+    the returned `absorbed` (prior row_hash → extra copies).
+
+    Returns (kept rows, absorbed, (row_hashes, sigs, valid) of kept rows).
+    """
+    sigs, valid = signatures(df["clean_text"], workers)
+    hashes = df["row_hash"].to_numpy()
+
+    m = 0
+    all_sigs, all_valid = sigs, valid
+    if prior is not None and len(prior[0]):
+        m = len(prior[0])
+        all_sigs  = np.concatenate([prior[1], sigs])
+        all_valid = np.concatenate([prior[2], valid])
+    cluster_id, cluster_size = cluster_signatures(all_sigs, all_valid, threshold)
+
+    root = cluster_id[m:]
+    keep = root == np.arange(m, m + len(df))
+    absorbed = pd.Series(prior[0][root[root < m]]).value_counts().to_dict() if m else {}
+
+    df = df.copy()
+    df["dup_cluster_id"]   = hashes
+    df["dup_cluster_size"] = cluster_size[m:]
+
+    print(f"Dropped {len(df) - keep.sum()} near-duplicate rows "
+          f"({(cluster_size[m:][keep] > 1).sum() + len(absorbed)} clusters, "
+          f"threshold {threshold})")
+    return df[keep], absorbed, (hashes[keep], sigs[keep], valid[keep])
+
+
+def prior_signatures(old: pd.DataFrame, workers: int = 1) -> tuple:
+    """Cached signatures for the rows of an existing output, computing any missing."""
+    hashes = old["row_hash"].to_numpy()
+    cached = load_signatures(SIG_CACHE)
+    sigs   = np.zeros((len(old), NUM_PERM), dtype=np.uint32)
+    valid  = np.zeros(len(old), dtype=bool)
+
+    missing = []
+    for i, h in enumerate(hashes):
+        if h in cached:
+            sigs[i], valid[i] = cached[h]
+        else:
+            missing.append(i)
+    if missing:
+        print(f"Computing signatures for {len(missing)} rows missing from {SIG_CACHE}")
+        sigs[missing], valid[missing] = signatures(old["clean_text"].iloc[missing].fillna(""),
+                                                   workers)
+    return hashes, sigs, valid
+
+
+# ── Streaming mode ────────────────────────────────────────────────────────────
+def _file_stats(path: str, columns: list, chunk_rows: int):
+    """(row count, {col: total string length}) for the text-choice columns, read in chunks."""
+    wanted = [c for c in ("full_text", "text") if c in columns] or columns[:1]
+    rows, lengths = 0, dict.fromkeys(wanted, 0)
+
+    for chunk in pd.read_csv(path, usecols=wanted, dtype=str, chunksize=chunk_rows):
+        rows += len(chunk)
+        for c in wanted:
+            lengths[c] += int(chunk[c].fillna("").str.len().sum())
+    return rows, lengths
+
+
+def plan_stream(files: list, chunk_rows: int):
+    """
+    Header-only pass over every file: which ones have rows, which column
+    becomes `text` for each, and the union of columns in pd.concat order.
+    """
+    plans, columns = [], []
+
+    for f in files:
+        name = os.path.basename(f)
+        try:
+            if os.path.getsize(f) == 0:
+                print("Skipping empty file:", f)
+                continue
+
+            header = list(pd.read_csv(f, nrows=0).columns)
+            rows, lengths = _file_stats(f, header, chunk_rows)
+            if rows == 0:
+                print("Skipping no-row file:", f)
+                continue
+
+            col = pick_text_column(name, header, lambda c: lengths[c] / rows)
+            plans.append((f, col))
+
+            for c in header + ["raw_file", "text"]:
+                if c not in columns:
+                    columns.append(c)
+
+        except Exception as e:
+            print("Skipping unreadable file:", f, "->", e)
+
+    return plans, columns
+
+
+def stream_clean(files: list, out_path: str = OUT_PATH, chunk_rows: int = CHUNK_ROWS,
+                 near_dup_threshold: float = None, workers: int = 1) -> set:
+    """
+    Clean raw files chunk by chunk, appending to `out_path` as we go.
+    With near-dup removal on (near_dup_threshold not None), the first pass
+    goes to a scratch CSV that the second pass filters into `out_path`.
+
+    Memory is bounded by one chunk plus a 16-byte digest per distinct text
+    (and a MinHash signature per kept row when near-dup removal is on).
+    Cells are read as strings, so numeric columns keep their raw CSV spelling.
+    Returns the row hashes of every distinct text seen.
+    """
+    plans, columns = plan_stream(files, chunk_rows)
+    if not plans:
+        print("No files loaded. Exiting.")
+        return set()
+
+    columns  = columns + ["row_hash", "clean_text"]
+    near_dup = near_dup_threshold is not None
+    sig_parts, valid_parts = [], []
+    if near_dup:
+        out = storage.TableWriter(os.path.splitext(out_path)[0] + ".pass1.csv", columns, "csv")
+    else:
+        out = storage.TableWriter(out_path, columns)
+
+    seen = set()
+    total = dropped = kept = 0
+
+    try:
+        for f, text_col in plans:
+            try:
+                for chunk in pd.read_csv(f, dtype=str, chunksize=chunk_rows):
+                    chunk = chunk.fillna("")
+                    chunk["raw_file"] = os.path.basename(f)
+                    if text_col != "text":
+                        chunk["text"] = chunk[text_col]
+
+                    # ── Deduplication across chunks ───────────────────────
+                    keep, digests = [], []
+                    for text in chunk["text"]:
+                        d = text_digest(text)
+                        keep.append(d not in seen)
+                        digests.append(d.hex())
+                        seen.add(d)
+                    chunk["row_hash"] = digests
+                    total   += len(chunk)
+                    chunk    = chunk[keep].copy()
+                    dropped += len(keep) - len(chunk)
+
+                    chunk = finish_chunk(chunk, workers)
+                    kept += len(chunk)
+                    if near_dup:
+                        sigs, valid = signatures(chunk["clean_text"], workers)
+                        sig_parts.append(sigs)
+                        valid_parts.append(valid)
+                    out.write(chunk)
+            except Exception as e:
+                print("Skipping rest of unreadable file:", f, "->", e)
+    finally:
+        out.close()
+
+    print("Total raw rows loaded:", total)
+    print(f"Dropped {dropped} duplicate rows")
+
+    if near_dup:
+        kept = _stream_near_dup_pass(out.path, out_path, columns, chunk_rows,
+                                     sig_parts, valid_parts, near_dup_threshold)
+
+    print("Saved to:", storage.path_for(out_path))
+    print("Rows after cleaning:", kept)
+    return {d.hex() for d in seen}
+
+
+def _stream_near_dup_pass(tmp_path: str, out_path: str, columns: list, chunk_rows: int,
+                          sig_parts: list, valid_parts: list, threshold: float) -> int:
+    """Second pass: cluster all signatures, then copy tmp → out keeping one row per cluster."""
+    sigs  = np.concatenate(sig_parts) if sig_parts else np.zeros((0, 1), dtype=np.uint32)
+    valid = np.concatenate(valid_parts) if valid_parts else np.zeros(0, dtype=bool)
+    cluster_id, cluster_size = cluster_signatures(sigs, valid, threshold)
+    reps = cluster_id == np.arange(len(cluster_id))
+
+    kept_hashes = []
+    out = storage.TableWriter(out_path, columns + ["dup_cluster_id", "dup_cluster_size"])
+    try:
+        start = 0
+        for chunk in pd.read_csv(tmp_path, dtype=str, keep_default_na=False,
+                                 chunksize=chunk_rows):
+            pos = np.arange(start, start + len(chunk))
+            start += len(chunk)
+            chunk["dup_cluster_id"]   = chunk["row_hash"]
+            chunk["dup_cluster_size"] = cluster_size[pos]
+            chunk = chunk[reps[pos]]
+            kept_hashes.extend(chunk["row_hash"])
+            out.write(chunk)
+    finally:
+        out.close()
+
+    os.remove(tmp_path)
+    save_signatures(SIG_CACHE, kept_hashes, sigs[reps], valid[reps])
+    print(f"Dropped {len(reps) - reps.sum()} near-duplicate rows "
+          f"({(cluster_size[reps] > 1).sum()} clusters, threshold {threshold})")
+    return len(kept_hashes)
+
+
+# ── Incremental mode ──────────────────────────────────────────────────────────
+def incremental_clean(files: list, manifest: Manifest, near_dup_threshold: float = None,
+                      workers: int = 1) -> bool:
+    """
+    Clean only rows of new/changed raw files whose text was never seen, and
+    merge them into the existing output. False if a full run is needed.
+    """
+    if not storage.exists(OUT_PATH):
+        print("No existing output — running a full clean")
+        return False
+    old = storage.read_table(OUT_PATH)
+    if "row_hash" not in old.columns:
+        print("Existing output predates the manifest — running a full clean")
+        return False
+
+    changed = [f for f in files if manifest.file_changed(f)]
+    print(f"Raw files changed since last run: {len(changed)}/{len(files)}")
+
+    dfs = load_raw_files(changed)
+    new = pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame(columns=["text"])
+    new["row_hash"] = row_hashes(new["text"].astype(str))
+
+    before = len(new)
+    new  = new.drop_duplicates(subset=["row_hash"], keep="first")
+    new  = new[~new["row_hash"].isin(manifest.processed("cleaning"))].copy()
+    seen = new["row_hash"].tolist()
+    print(f"New rows to clean: {len(new)} (of {before} in changed files)")
+
+    if len(new):
+        new = finish_chunk(new, workers)
+
+    if near_dup_threshold is not None and len(new):
+        prior = prior_signatures(old, workers)
+        new, absorbed, kept = drop_near_duplicates(new, near_dup_threshold, prior, workers)
+        if absorbed and "dup_cluster_size" in old.columns:
+            extra = old["row_hash"].map(absorbed).fillna(0).astype(int)
+            old["dup_cluster_size"] = old["dup_cluster_size"].fillna(1).astype(int) + extra
+        save_signatures(SIG_CACHE, np.concatenate([prior[0], kept[0]]),
+                        np.concatenate([prior[1], kept[1]]),
+                        np.concatenate([prior[2], kept[2]]))
+
+    out = pd.concat([old, new], ignore_index=True)
+    saved = storage.write_table(out, OUT_PATH)
+
+    manifest.mark_processed("cleaning", seen)
+    manifest.record_files(files)
+    manifest.save()
+
+    print("Saved to:", saved)
+    print(f"Rows after cleaning: {len(out)} ({len(new)} added)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge and clean raw scraper CSVs")
+    parser.add_argument("--stream", action="store_true",
+                        help="read raw files in chunks and write output incrementally")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="rows per chunk in --stream mode")
+    parser.add_argument("--near-dup", action="store_true",
+                        help="also drop near-duplicate copies of a story (see nlp/near_dup.py)")
+    parser.add_argument("--near-dup-threshold", type=float, default=NEAR_DUP_THRESHOLD,
+                        help="shingle Jaccard at which rows count as copies (with --near-dup)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only clean rows not seen by earlier runs (see nlp/manifest.py)")
+    add_workers_arg(parser)
+    args = storage.add_format_arg(parser).parse_args()
+    storage.use(args.format)
+    near_dup_threshold = args.near_dup_threshold if args.near_dup else None
+
+    os.makedirs("data/processed", exist_ok=True)
+
+    files    = raw_files()
+    manifest = Manifest()
+
+    if args.incremental and incremental_clean(files, manifest, near_dup_threshold,
+                                              args.workers):
+        return
+
+    if args.stream:
+        seen = stream_clean(files, OUT_PATH, args.chunk_rows, near_dup_threshold,
+                            args.workers)
+        if seen:
+            manifest.mark_processed("cleaning", seen, reset=True)
+            manifest.record_files(files)
+            manifest.save()
+        return
+
+    dfs = load_raw_files(files)
+    if not dfs:
+        print("No files loaded. Exiting.")
+        return
+
+    all_df = pd.concat(dfs, ignore_index=True)
+    print("Total raw rows loaded:", len(all_df))
+
+    # ── Deduplication ─────────────────────────────────────────────────────────
+    before = len(all_df)
+    all_df = all_df.drop_duplicates(subset=["text"], keep="first")
+    print(f"Dropped {before - len(all_df)} duplicate rows")
+
+    all_df["row_hash"] = row_hashes(all_df["text"].astype(str))
+    seen   = all_df["row_hash"].tolist()
+    all_df = finish_chunk(all_df, args.workers)
+
+    if near_dup_threshold is not None:
+        all_df, _, kept = drop_near_duplicates(all_df, near_dup_threshold,
+                                               workers=args.workers)
+        save_signatures(SIG_CACHE, *kept)
+
+    saved = storage.write_table(all_df, OUT_PATH)
+
+    manifest.mark_processed("cleaning", seen, reset=True)
+    manifest.record_files(files)
+    manifest.save()
 
-all_df = all_df[all_df["clean_text"].str.len() > 20]
+    print("Saved to:", saved)
+    print("Rows after cleaning:", len(all_df))
 
-all_df.to_csv(OUT_PATH, index=False)
 
-print("Saved to:", OUT_PATH)
-print("Rows after cleaning:", len(all_df))
\ No newline at end of file
+if __name__ == "__main__":
+    main()
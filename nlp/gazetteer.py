@@ -0,0 +1,130 @@
+"""
+nlp/gazetteer.py
+Known-IPO tagger: a token trie of discovered IPO names and their aliases.
+
+Seeded only from the live IPO list that scraping/google_news.py caches in
+data/cache/ipo_discovery.json. The hand-kept alias maps (NORMALIZE,
+MANUAL_NORMALIZE) just rewrite those names to their canonical form; their
+own keys and targets never enter the trie, since they include names that
+are not IPOs at all ("National Stock Exchange" → "NSE"). Junk, short and
+exchange/regulator names are left out too. Matching
+walks the text's tokens once, taking the longest known name at each token
+(case-insensitive, but the match must start with a capital or digit), so
+cost is linear in the text and independent of how many IPOs are known.
+"""
+
+import json
+import re
+
+DISCOVERY_CACHE    = "data/cache/ipo_discovery.json"   # written by scraping/google_news.py
+CORPORATE_SUFFIXES = {"limited", "ltd", "pvt", "private"}
+MIN_ALIAS_CHARS    = 4   # shorter aliases ("NSE", "Rs") match too much prose
+MIN_NAME_CHARS     = 5   # shorter canonical names are fragments, never tagged
+EXCHANGE_NAMES     = {
+    "nse", "bse", "sebi", "nse emerge", "bse sme",
+    "national stock exchange", "national stock exchange of india",
+    "bombay stock exchange", "securities and exchange board of india",
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+|&")
+_END      = None   # trie key holding the canonical name (tokens are never None)
+
+
+def tokens(text: str) -> list:
+    """(lowercased token, start, end) for each word or "&" in `text`."""
+    return [(m.group().lower(), m.start(), m.end()) for m in _TOKEN_RE.finditer(text)]
+
+
+def load_discovered(path: str = DISCOVERY_CACHE) -> list:
+    """IPO names from the last discovery run, however old; [] if there is none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            names = json.load(f).get("names", [])
+    except (OSError, ValueError):
+        return []
+    return [n for n in names if isinstance(n, str)]
+
+
+def aliases_for(name: str) -> list:
+    """The name, and the name without a trailing "Limited"/"Ltd"/... ."""
+    words = name.split()
+    while len(words) > 1 and words[-1].lower().rstrip(".") in CORPORATE_SUFFIXES:
+        words.pop()
+    short = " ".join(words)
+    return [name] if short == name else [name, short]
+
+
+def is_taggable(name: str, junk=frozenset()) -> bool:
+    """False for names the gazetteer must never tag: junk, too short, or an exchange."""
+    key = name.strip().lower()
+    return len(key) >= MIN_NAME_CHARS and key not in junk and key not in EXCHANGE_NAMES
+
+
+def resolve(name: str, alias_maps: list):
+    """Canonical form of `name` after each alias map in turn; None if a map drops it."""
+    for mapping in alias_maps:
+        if name in mapping:
+            name = mapping[name]
+            if name is None:
+                return None
+    return name
+
+
+class Gazetteer:
+    def __init__(self, entries: dict):
+        """`entries` maps alias → canonical name."""
+        self.trie    = {}
+        self.aliases = 0
+        self.names   = set()
+        for alias, canonical in entries.items():
+            keys = [tok for tok, _, _ in tokens(alias)]
+            if not keys or len(alias) < MIN_ALIAS_CHARS:
+                continue
+            node = self.trie
+            for key in keys:
+                node = node.setdefault(key, {})
+            if _END not in node:
+                node[_END] = canonical
+                self.aliases += 1
+                self.names.add(canonical)
+
+    @classmethod
+    def from_sources(cls, discovered: list, alias_maps: list = (), junk=frozenset()):
+        """
+        Discovered names (and their suffix-less forms) → canonical name after
+        `alias_maps`. Names that resolve to None or fail is_taggable() against
+        `junk` (lowercased names) are skipped.
+        """
+        entries = {}
+        for name in discovered:
+            canonical = resolve(aliases_for(name)[-1], alias_maps)   # "X Limited" → "X"
+            if canonical is None or not is_taggable(canonical, junk):
+                continue
+            for alias in aliases_for(name) + aliases_for(canonical):
+                if is_taggable(alias, junk):
+                    entries.setdefault(alias, canonical)
+        return cls(entries)
+
+    def find(self, text: str) -> list:
+        """Known IPOs in `text` as (canonical, start, end), leftmost-longest, non-overlapping."""
+        if not isinstance(text, str):
+            return []
+        toks = tokens(text)
+        found, i = [], 0
+        while i < len(toks):
+            node, best, j = self.trie, None, i
+            while j < len(toks):
+                node = node.get(toks[j][0])
+                if node is None:
+                    break
+                j += 1
+                if _END in node:
+                    best = (node[_END], j)
+
+            start = toks[i][1]
+            if best is not None and not text[start].islower():
+                found.append((best[0], start, toks[best[1] - 1][2]))
+                i = best[1]
+            else:
+                i += 1
+        return found
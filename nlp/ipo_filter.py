@@ -1,36 +1,66 @@
-import pandas as pd
+import argparse
 import os
+from collections import Counter
+from functools import partial
+
+import storage
+from ipo_terms import KEYWORDS, WORD_BOUNDARY, is_ipo_related, matcher
+from keyword_matcher import format_hits
+from manifest import Manifest, ensure_row_hash, rows_to_process, stage_output
+from parallel import add_workers_arg, parallel_map
 
 IN_PATH  = "data/processed/all_news_clean.csv"
 OUT_PATH = "data/processed/all_news_ipo_only.csv"
 
-KEYWORDS = [
-    "ipo",
-    "public issue",
-    "listing",
-    "drhp",
-    "rhp",
-    "sebi",
-    "subscription",
-    "anchor investor",
-    "grey market",
-    "gmp",
-    "allotment",
-    "price band",
-]
-
-df = pd.read_csv(IN_PATH)
-print("Input rows:", len(df))
-
-def is_ipo_related(text):
-    text = str(text).lower()
-    return any(k in text for k in KEYWORDS)
-
-mask = df["clean_text"].apply(is_ipo_related)
-df   = df[mask].copy()
-
-os.makedirs("data/processed", exist_ok=True)
-df.to_csv(OUT_PATH, index=False)
-
-print("IPO-related rows:", len(df))
-print("Saved to:", OUT_PATH)
\ No newline at end of file
+
+def ipo_related_mask(texts: list, word_boundary: bool = WORD_BOUNDARY) -> list:
+    return [is_ipo_related(t, word_boundary) for t in texts]
+
+
+def keyword_hits(texts: list, word_boundary: bool = WORD_BOUNDARY) -> list:
+    """Per text, every keyword occurrence as (start, keyword)."""
+    m = matcher(word_boundary)
+    return [m.find(str(t).lower()) for t in texts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep IPO-related rows")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only filter rows not seen by earlier runs")
+    parser.add_argument("--word-boundary", action="store_true", default=WORD_BOUNDARY,
+                        help="only match keywords as whole words")
+    add_workers_arg(parser)
+    args = storage.add_format_arg(parser).parse_args()
+    storage.use(args.format)
+
+    df = ensure_row_hash(storage.read_table(IN_PATH))
+    print("Input rows:", len(df))
+
+    manifest = Manifest()
+    todo = rows_to_process(df, "ipo_filter", manifest, OUT_PATH, args.incremental)
+
+    print(f"Matching {len(KEYWORDS)} keywords ({matcher(args.word_boundary).backend})")
+    hits = parallel_map(partial(keyword_hits, word_boundary=args.word_boundary),
+                        todo["clean_text"], args.workers)
+    mask = [bool(h) for h in hits]
+
+    kept = todo.loc[mask].copy()
+    kept["keyword_hits"]    = [len(h) for h in hits if h]
+    kept["keyword_matches"] = [format_hits(h) for h in hits if h]
+
+    counts = Counter(kw for h in hits for _, kw in h)
+    if counts:
+        print("Keyword hits:", ", ".join(f"{kw} {n}" for kw, n in counts.most_common()))
+
+    out = stage_output(kept, todo, df, "ipo_filter", manifest, OUT_PATH, args.incremental)
+
+    os.makedirs("data/processed", exist_ok=True)
+    saved = storage.write_table(out, OUT_PATH)
+    manifest.save()
+
+    print("IPO-related rows:", len(out))
+    print("Saved to:", saved)
+
+
+if __name__ == "__main__":
+    main()
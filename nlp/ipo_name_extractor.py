@@ -1,155 +1,132 @@
-import pandas as pd
-import re
+import argparse
+from collections import Counter
+from functools import partial
+
+import storage
+from gazetteer import Gazetteer, load_discovered
+from ipo_terms import NORMALIZE, extract_batch, known_ipos
+from manifest import Manifest, ensure_row_hash, rows_to_process, stage_output
+from parallel import add_workers_arg, parallel_map
 
 IN_PATH  = "data/processed/all_news_ipo_only.csv"
 OUT_PATH = "data/processed/ipo_tagged_news.csv"
 
-# ── Known company name stopwords ─────────────────────────────────────────────
-# Words that should NEVER appear in a valid company name
-NAME_STOPWORDS = {
-    "upcoming", "mainboard", "sme", "big", "new", "check", "total", "record",
-    "india", "crore", "cr", "million", "billion", "only", "from", "six",
-    "nine", "four", "which", "the", "about", "where", "what", "why", "each",
-    "click", "latest", "average", "korean", "rebounding", "rs", "ipo",
-    "sebi", "bse", "nse", "drhp", "gmp", "all", "top", "best", "key",
-    "major", "five", "three", "two", "ten", "how", "when", "first", "last",
-    "this", "that", "more", "most", "many", "some", "other", "your", "our",
-    "their", "its", "has", "have", "had", "was", "were", "will", "would",
-    "here", "there", "into", "over", "under", "after", "before", "during",
-    "amid", "versus", "vs", "per", "via", "and", "for", "with",
-
-    # ── Step 1: added stopwords ──
-    "unprecedented", "indian", "startup", "biggest", "resorts",
-    "spacex", "backed", "largest", "booming", "busiest"
-}
-
-# ── Step 2: Name normalization map ───────────────────────────────────────────
-NORMALIZE = {
-    "Shadowfax Tech": "Shadowfax Technologies",
-    "Shadowfax": "Shadowfax Technologies",
-    "Advit Jewels Limited": "Advit Jewels",
-    "Meesho Files": "Meesho",
-    "Hannah Joseph": "Hannah Joseph Hospital",
-    "PhonePe PhonePe": "PhonePe",
-    "Backed PhonePe": "PhonePe",
-    "UPL Subsidiary Advanta Enterprises": "Advanta Enterprises",
-    "E Transportation Infrastructure": "E Transportation",
-    "Madhur Iron & Steel Files": "Madhur Iron & Steel",
-    "Fujiyama Power Systems": "Fujiyama Power",
-    "Kanishk Aluminium India": "Kanishk Aluminium",
-    "SMEs TO Launch": None,
-    "Indian Stock Exchanges Following Successful": None,
-    "Fractal Analytics & Others": "Fractal Analytics",
-    "Clean Max Enviro Energy Solutions": "CleanMax Enviro Energy",
-    "Clean Max Enviro Energy":           "CleanMax Enviro Energy",
-    "Clean Max Enviro":                  "CleanMax Enviro Energy",
-    "Clean Max":                         "CleanMax Enviro Energy",
-    "CleanMax Enviro":                   "CleanMax Enviro Energy",
-    "CleanMax Plans":                    "CleanMax Enviro Energy",
-    "Can Clean Max":                     "CleanMax Enviro Energy",
-    "Does Clean Max Enviro Energy":      None,
-    "Mobilise App Lab Limited":          "Mobilise App Lab",
-    "Mobilise App":                      "Mobilise App Lab",
-    "Bonfiglioli Transmissions Limited": "Bonfiglioli Transmissions",
-    "Pride Hotels Limited":              "Pride Hotels",
-    "PhonePe Files Draft":               "PhonePe",
-    "Fractal Industries":                "Fractal Analytics",
-    "Shree Ram":                         "Shree Ram Twistex",
-    "Plans":    None,
-    "Proposed": None,
-    "Christmas": None,
-    "Dual":     None,
-    "Steel":    None,
-    "Market":   None,
-    "Revenue CAGR Post": None,
-    "Research Centre":   None,
-}
-
-# ── Regex patterns (1–5 word company name, title-cased) ──────────────────────
-# Each pattern captures a NAMED GROUP called "name"
-_COMPANY = r"(?P<name>[A-Z][a-zA-Z&]*(?:\s[A-Z&][a-zA-Z&]*){0,4})"
-
-PATTERNS = [
-    rf"IPO of {_COMPANY}",
-    rf"{_COMPANY} IPO",
-    rf"{_COMPANY} [Ff]iles [Dd]RHP",
-    rf"{_COMPANY} [Gg]ets [Ss]ebi [Nn]od",
-    rf"{_COMPANY} [Gg]ets SEBI [Nn]od",
-    rf"{_COMPANY} [Ss]ecures SEBI",
-    rf"{_COMPANY} [Rr]eceives SEBI",
-    rf"{_COMPANY} [Pp]ublic [Ii]ssue",
-    rf"{_COMPANY} [Ll]aunches IPO",
-    rf"{_COMPANY} [Tt]o [Rr]aise",
-    rf"{_COMPANY} [Ll]ists [Oo]n",
-    rf"{_COMPANY} [Pp]repares for IPO",
-]
-
-
-def extract_name(text: str):
-    if not isinstance(text, str):
-        return None
-
-    for pat in PATTERNS:
-        m = re.search(pat, text)
-        if m:
-            candidate = m.group("name").strip()
-            if is_valid_ipo_name(candidate):
-                return candidate
-    return None
-
-
-def is_valid_ipo_name(name: str) -> bool:
-    if not name or not isinstance(name, str):
-        return False
-
-    name = name.strip()
-
-    # Length guards
-    if len(name) < 3 or len(name) > 50:
-        return False
-
-    # Must start with uppercase
-    if not name[0].isupper():
-        return False
-
-    words = name.split()
-
-    # Single-word names must be 4+ chars (avoids "Cr", "Rs", "An")
-    if len(words) == 1 and len(name) < 4:
-        return False
-
-    # Reject if ANY word is a stopword
-    if any(w.lower() in NAME_STOPWORDS for w in words):
-        return False
-
-    # Must have at least one real alphabetic word
-    real_words = [w for w in words if re.match(r"[A-Za-z]{2,}", w)]
-    if not real_words:
-        return False
-
-    return True
+# One output row per distinct IPO named in an article (roundups count for
+# each company) instead of one row for its primary name
+ATTRIBUTE_ALL_MENTIONS = False
+
+# Tag known IPOs (discovered names, see nlp/gazetteer.py): a known IPO in the
+# title wins, then the title regexes (nlp/ipo_terms.py); the full text is
+# only consulted when both find nothing there
+USE_GAZETTEER = True
+
+
+# ── Tagging ───────────────────────────────────────────────────────────────────
+def tag_batch(rows: list, gazetteer: Gazetteer = None) -> list:
+    """
+    (primary name, mentions, tagger) per (title, text) row, in order of trust:
+
+    1. the first known IPO in the title (mentions: known IPOs in the text,
+       else the title)
+    2. the title regexes
+    3. the known IPO the text names most often — a body-only hit never
+       overrides a name the title gives
+    """
+    out = []
+    for title, text in rows:
+        in_title = gazetteer.find(title) if gazetteer is not None else []
+        if in_title:
+            out.append((in_title[0][0], gazetteer.find(text) or in_title, "gazetteer"))
+            continue
+
+        primary, mentions = extract_batch([title])[0]
+        if primary is None and gazetteer is not None:
+            in_text = gazetteer.find(text)
+            if in_text:
+                primary = Counter(name for name, _, _ in in_text).most_common(1)[0][0]
+                out.append((primary, in_text, "gazetteer"))
+                continue
+        out.append((primary, mentions, "regex" if primary or mentions else None))
+    return out
+
+
+def format_mentions(mentions: list) -> str:
+    """[(name, start, end), ...] → "name@start-end;..." for a CSV cell."""
+    return ";".join(f"{name}@{start}-{end}" for name, start, end in mentions)
+
+
+def mention_names(mentions: list) -> list:
+    """Distinct normalised names, first mention first; names NORMALIZE drops are skipped."""
+    names = []
+    for name, _, _ in mentions:
+        name = NORMALIZE.get(name, name)
+        if name is not None and name not in names:
+            names.append(name)
+    return names
 
 
 # ── Pipeline ──────────────────────────────────────────────────────────────────
-print("Reading:", IN_PATH)
-df = pd.read_csv(IN_PATH)
-print("Rows to tag:", len(df))
-
-text_col = "title" if "title" in df.columns else "text"
-print(f"Extracting from column: '{text_col}'")
-
-df["ipo_name"] = df[text_col].apply(extract_name)
-
-before = df["ipo_name"].notna().sum()
-print(f"Extracted (before cleaning): {before}")
-
-df = df[df["ipo_name"].notna()].copy()
-
-# ── Step 3: Apply normalization ──────────────────────────────────────────────
-df["ipo_name"] = df["ipo_name"].apply(lambda x: NORMALIZE.get(x, x))
-df = df[df["ipo_name"].notna()]
-
-print(f"Tagged rows (after normalization): {len(df)}")
-
-df.to_csv(OUT_PATH, index=False)
-print("Saved to:", OUT_PATH)
\ No newline at end of file
+def main():
+    parser = argparse.ArgumentParser(description="Tag rows with the IPO they mention")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only tag rows not seen by earlier runs")
+    parser.add_argument("--all-mentions", action="store_true", default=ATTRIBUTE_ALL_MENTIONS,
+                        help="one row per IPO named in an article, not just the primary one")
+    parser.add_argument("--no-gazetteer", action="store_true", default=not USE_GAZETTEER,
+                        help="title regexes only; ignore the discovered IPO list")
+    add_workers_arg(parser)
+    args = storage.add_format_arg(parser).parse_args()
+    storage.use(args.format)
+
+    print("Reading:", IN_PATH)
+    current = ensure_row_hash(storage.read_table(IN_PATH))
+    manifest = Manifest()
+    todo = rows_to_process(current, "ipo_name_extractor", manifest, OUT_PATH,
+                           args.incremental)
+    df = todo.copy()
+    print("Rows to tag:", len(df))
+
+    text_col = "title" if "title" in df.columns else "text"
+    body_col = "text" if "text" in df.columns else text_col
+    print(f"Extracting from column: '{text_col}'")
+
+    gazetteer = None
+    if not args.no_gazetteer:
+        discovered = load_discovered()
+        gazetteer  = known_ipos(discovered)
+        print(f"Gazetteer: {gazetteer.aliases} aliases for {len(gazetteer.names)} IPOs "
+              f"({len(discovered)} discovered), matched in '{body_col}'")
+
+    rows    = list(zip(df[text_col], df[body_col]))
+    results = parallel_map(partial(tag_batch, gazetteer=gazetteer), rows, args.workers)
+    df["ipo_name"]     = [primary for primary, _, _ in results]
+    df["ipo_mentions"] = [format_mentions(mentions) for _, mentions, _ in results]
+    df["ipo_tagger"]   = [tagger for _, _, tagger in results]
+
+    before = df["ipo_name"].notna().sum()
+    print(f"Extracted (before cleaning): {before}")
+    print("By tagger:", dict(Counter(t for _, _, t in results if t)))
+    print(f"Articles naming more than one IPO: {sum(len(m) > 1 for _, m, _ in results)}")
+
+    if args.all_mentions:
+        df["ipo_name"] = [mention_names(mentions) or None for _, mentions, _ in results]
+        df = df[df["ipo_name"].notna()].explode("ipo_name")
+        print(f"Tagged rows (one per mention): {len(df)}")
+    else:
+        df = df[df["ipo_name"].notna()].copy()
+
+        # ── Step 3: Apply normalization ──────────────────────────────────────
+        df["ipo_name"] = df["ipo_name"].apply(lambda x: NORMALIZE.get(x, x))
+        df = df[df["ipo_name"].notna()]
+
+        print(f"Tagged rows (after normalization): {len(df)}")
+
+    df = stage_output(df, todo, current, "ipo_name_extractor", manifest, OUT_PATH,
+                      args.incremental)
+    saved = storage.write_table(df, OUT_PATH)
+    manifest.save()
+    print("Saved to:", saved)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,14 @@ Phase 5 — Final IPO Signal Generator
 
 import pandas as pd
 import numpy as np
+import argparse
 import os
 
+import storage
+
 SUMMARY_PATH = "data/processed/ipo_sentiment_summary.csv"
 TREND_PATH   = "data/processed/ipo_sentiment_trend.csv"
-OUT_PATH     = "data/processed/ipo_final_signals.csv"
+OUT_PATH     = "data/processed/ipo_final_signals.csv"   # CSV always written: the deliverable
 
 os.makedirs("data/processed", exist_ok=True)
 
@@ -58,9 +61,13 @@ def normalize_buzz(article_counts: pd.Series) -> pd.Series:
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 def main():
+    parser = argparse.ArgumentParser(description="Final IPO signal generator")
+    args = storage.add_format_arg(parser).parse_args()
+    storage.use(args.format)
+
     print("Loading data...")
-    summary = pd.read_csv(SUMMARY_PATH)
-    trend   = pd.read_csv(TREND_PATH)
+    summary = storage.read_table(SUMMARY_PATH)
+    trend   = storage.read_table(TREND_PATH)
     print(f"  → {len(summary)} IPOs before filtering")
 
     # ── Remove junk names ─────────────────────────────────────────────────────
@@ -127,10 +134,12 @@ def main():
         "score_sentiment", "score_buzz", "score_consistency", "score_trend",
     ]
     output = summary[out_cols].sort_values("final_score", ascending=False)
-    output.to_csv(OUT_PATH, index=False)
+    saved = storage.write_table(output, OUT_PATH)
+    if saved != OUT_PATH:
+        output.to_csv(OUT_PATH, index=False)
 
     # ── Print ─────────────────────────────────────────────────────────────────
-    print(f"\n✅ Saved to {OUT_PATH}")
+    print(f"\n✅ Saved to {OUT_PATH}" + (f" and {saved}" if saved != OUT_PATH else ""))
     print(f"\n{'='*68}")
     print(f"{'IPO NAME':<32} {'SIGNAL':<9} {'CONF':<8} {'SCORE':<8} {'ARTICLES'}")
     print(f"{'='*68}")
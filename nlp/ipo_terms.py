@@ -0,0 +1,379 @@
+"""
+nlp/ipo_terms.py
+IPO keywords and company-name rules, shared by the NLP stages (ipo_filter,
+ipo_name_extractor, aggregate_sentiment) and the scraper's pre-fetch
+relevance gate (scraping/relevance.py), so both apply the same checks.
+
+Deliberately light — stdlib plus keyword_matcher and gazetteer, no pandas
+or rapidfuzz — since the scraper imports it on every crawl.
+"""
+
+import re
+
+from gazetteer import Gazetteer, load_discovered
+from keyword_matcher import KeywordMatcher
+
+# ── IPO keywords (ipo_filter) ─────────────────────────────────────────────────
+KEYWORDS = [
+    "ipo",
+    "public issue",
+    "listing",
+    "drhp",
+    "rhp",
+    "sebi",
+    "subscription",
+    "anchor investor",
+    "grey market",
+    "gmp",
+    "allotment",
+    "price band",
+]
+
+WORD_BOUNDARY = False   # True: "rhp" no longer matches inside "drhp", nor "ipo" in "ipos"
+
+_MATCHERS = {}   # word_boundary → compiled matcher, built once per process
+
+
+def matcher(word_boundary: bool = WORD_BOUNDARY) -> KeywordMatcher:
+    if word_boundary not in _MATCHERS:
+        _MATCHERS[word_boundary] = KeywordMatcher(KEYWORDS, word_boundary)
+    return _MATCHERS[word_boundary]
+
+
+def is_ipo_related(text, word_boundary: bool = WORD_BOUNDARY):
+    return matcher(word_boundary).contains(str(text).lower())
+
+
+# ── Known company name stopwords ─────────────────────────────────────────────
+# Words that should NEVER appear in a valid company name
+NAME_STOPWORDS = {
+    "upcoming", "mainboard", "sme", "big", "new", "check", "total", "record",
+    "india", "crore", "cr", "million", "billion", "only", "from", "six",
+    "nine", "four", "which", "the", "about", "where", "what", "why", "each",
+    "click", "latest", "average", "korean", "rebounding", "rs", "ipo",
+    "sebi", "bse", "nse", "drhp", "gmp", "all", "top", "best", "key",
+    "major", "five", "three", "two", "ten", "how", "when", "first", "last",
+    "this", "that", "more", "most", "many", "some", "other", "your", "our",
+    "their", "its", "has", "have", "had", "was", "were", "will", "would",
+    "here", "there", "into", "over", "under", "after", "before", "during",
+    "amid", "versus", "vs", "per", "via", "and", "for", "with",
+
+    # ── Step 1: added stopwords ──
+    "unprecedented", "indian", "startup", "biggest", "resorts",
+    "spacex", "backed", "largest", "booming", "busiest"
+}
+
+# ── Step 2: Name normalization map ───────────────────────────────────────────
+NORMALIZE = {
+    "Shadowfax Tech": "Shadowfax Technologies",
+    "Shadowfax": "Shadowfax Technologies",
+    "Advit Jewels Limited": "Advit Jewels",
+    "Meesho Files": "Meesho",
+    "Hannah Joseph": "Hannah Joseph Hospital",
+    "PhonePe PhonePe": "PhonePe",
+    "Backed PhonePe": "PhonePe",
+    "UPL Subsidiary Advanta Enterprises": "Advanta Enterprises",
+    "E Transportation Infrastructure": "E Transportation",
+    "Madhur Iron & Steel Files": "Madhur Iron & Steel",
+    "Fujiyama Power Systems": "Fujiyama Power",
+    "Kanishk Aluminium India": "Kanishk Aluminium",
+    "SMEs TO Launch": None,
+    "Indian Stock Exchanges Following Successful": None,
+    "Fractal Analytics & Others": "Fractal Analytics",
+    "Clean Max Enviro Energy Solutions": "CleanMax Enviro Energy",
+    "Clean Max Enviro Energy":           "CleanMax Enviro Energy",
+    "Clean Max Enviro":                  "CleanMax Enviro Energy",
+    "Clean Max":                         "CleanMax Enviro Energy",
+    "CleanMax Enviro":                   "CleanMax Enviro Energy",
+    "CleanMax Plans":                    "CleanMax Enviro Energy",
+    "Can Clean Max":                     "CleanMax Enviro Energy",
+    "Does Clean Max Enviro Energy":      None,
+    "Mobilise App Lab Limited":          "Mobilise App Lab",
+    "Mobilise App":                      "Mobilise App Lab",
+    "Bonfiglioli Transmissions Limited": "Bonfiglioli Transmissions",
+    "Pride Hotels Limited":              "Pride Hotels",
+    "PhonePe Files Draft":               "PhonePe",
+    "Fractal Industries":                "Fractal Analytics",
+    "Shree Ram":                         "Shree Ram Twistex",
+    "Plans":    None,
+    "Proposed": None,
+    "Christmas": None,
+    "Dual":     None,
+    "Steel":    None,
+    "Market":   None,
+    "Revenue CAGR Post": None,
+    "Research Centre":   None,
+}
+
+# ── Regex patterns (1–5 word company name, title-cased) ──────────────────────
+# Each pattern captures a NAMED GROUP called "name"
+_COMPANY = r"(?P<name>[A-Z][a-zA-Z&]*(?:\s[A-Z&][a-zA-Z&]*){0,4})"
+
+PATTERNS = [
+    rf"IPO of {_COMPANY}",
+    rf"{_COMPANY} IPO",
+    rf"{_COMPANY} [Ff]iles [Dd]RHP",
+    rf"{_COMPANY} [Gg]ets [Ss]ebi [Nn]od",
+    rf"{_COMPANY} [Gg]ets SEBI [Nn]od",
+    rf"{_COMPANY} [Ss]ecures SEBI",
+    rf"{_COMPANY} [Rr]eceives SEBI",
+    rf"{_COMPANY} [Pp]ublic [Ii]ssue",
+    rf"{_COMPANY} [Ll]aunches IPO",
+    rf"{_COMPANY} [Tt]o [Rr]aise",
+    rf"{_COMPANY} [Ll]ists [Oo]n",
+    rf"{_COMPANY} [Pp]repares for IPO",
+]
+
+
+# ── Combined matcher ─────────────────────────────────────────────────────────
+# All PATTERNS in one lookahead, so a single scan visits every offset. The
+# ones that start with _COMPANY share it (one name group, then the suffixes
+# as alternatives p{i}); the rest keep their own name group n{i}. lastgroup
+# names the pattern that matched, and only at those offsets are the other
+# patterns tried on their own — a pattern never misses an offset because an
+# earlier one matched there.
+def _combined(patterns: list) -> str:
+    shared, own = [], []
+    for i, pat in enumerate(patterns):
+        if pat.startswith(_COMPANY):
+            shared.append(f"(?P<p{i}>{pat[len(_COMPANY):]})")
+        else:
+            own.append(f"(?P<p{i}>" + pat.replace("(?P<name>", f"(?P<n{i}>") + ")")
+    if shared:
+        own.append(_COMPANY + "(?:" + "|".join(shared) + ")")
+    return "(?=" + "|".join(own) + ")"
+
+
+COMBINED = re.compile(_combined(PATTERNS))
+_SINGLE  = [re.compile(p) for p in PATTERNS]
+
+
+def pattern_matches(text: str) -> list:
+    """Every (pattern index, match start, name start, name end) in `text`, by offset."""
+    found = []
+    for m in COMBINED.finditer(text):
+        pos   = m.start()
+        first = int(m.lastgroup[1:])
+        found.append((first, pos) + m.span(f"n{first}" if m.start("name") < 0 else "name"))
+        for i, single in enumerate(_SINGLE):
+            other = single.match(text, pos) if i != first else None
+            if other:
+                found.append((i, pos) + other.span("name"))
+    found.sort(key=lambda f: (f[1], f[0]))
+    return found
+
+
+def _primary(text: str, found: list):
+    """The first valid name in PATTERNS order, each pattern at its earliest match."""
+    earliest = {}
+    for i, _, start, end in found:
+        earliest.setdefault(i, (start, end))
+    for i in sorted(earliest):
+        candidate = text[slice(*earliest[i])].strip()
+        if is_valid_ipo_name(candidate):
+            return candidate
+    return None
+
+
+def _mentions(text: str, found: list) -> list:
+    """Valid names as (name, start, end), left to right, never overlapping."""
+    mentions, last_end = [], 0
+    for _, _, start, end in sorted(found, key=lambda f: (f[2], f[0])):
+        candidate = text[start:end].strip()
+        at_word   = start == 0 or not text[start - 1].isalnum()
+        if start >= last_end and at_word and is_valid_ipo_name(candidate):
+            mentions.append((candidate, start, end))
+            last_end = end
+    return mentions
+
+
+def extract_name(text: str):
+    if not isinstance(text, str):
+        return None
+    return _primary(text, pattern_matches(text))
+
+
+def extract_mentions(text: str) -> list:
+    """Every IPO named in `text` as (name, start, end)."""
+    if not isinstance(text, str):
+        return []
+    return _mentions(text, pattern_matches(text))
+
+
+def extract_names(texts: list) -> list:
+    return [extract_name(t) for t in texts]
+
+
+def extract_batch(texts: list) -> list:
+    """(primary name, mentions) per text, from one scan each."""
+    out = []
+    for text in texts:
+        if not isinstance(text, str):
+            out.append((None, []))
+            continue
+        found = pattern_matches(text)
+        out.append((_primary(text, found), _mentions(text, found)))
+    return out
+
+
+def is_valid_ipo_name(name: str) -> bool:
+    if not name or not isinstance(name, str):
+        return False
+
+    name = name.strip()
+
+    # Length guards
+    if len(name) < 3 or len(name) > 50:
+        return False
+
+    # Must start with uppercase
+    if not name[0].isupper():
+        return False
+
+    words = name.split()
+
+    # Single-word names must be 4+ chars (avoids "Cr", "Rs", "An")
+    if len(words) == 1 and len(name) < 4:
+        return False
+
+    # Reject if ANY word is a stopword
+    if any(w.lower() in NAME_STOPWORDS for w in words):
+        return False
+
+    # Must have at least one real alphabetic word
+    real_words = [w for w in words if re.match(r"[A-Za-z]{2,}", w)]
+    if not real_words:
+        return False
+
+    return True
+
+
+# ── Known junk names to drop before anything else ────────────────────────────
+JUNK_NAMES = {
+    "upcoming", "mainboard", "sme", "big", "new", "check", "total",
+    "record", "india", "crore", "cr", "million", "billion", "only",
+    "from", "six", "nine", "four", "which", "the", "about", "where",
+    "what", "why", "each", "click", "latest", "average", "korean",
+    "rebounding", "rs", "sebi", "bse", "nse", "drhp", "gmp", "all",
+    "top", "best", "key", "major", "five", "three", "two", "ten",
+    "how", "when", "first", "last", "this", "that", "more", "most",
+    "here", "there", "into", "over", "under", "after", "before",
+    "amid", "versus", "vs", "per", "via", "and", "for", "with",
+    "plans", "proposed", "christmas", "dual", "steel", "market",
+    "revenue cagr post", "research centre", "industries", "healthcare",
+    "historic", "download", "current", "global", "infra", "hour",
+    "live", "open", "bold", "mixed", "these", "year", "ipos",
+    "groundbreaking", "gleaming", "landmark", "firms eye",
+    "stock brokers", "anchor investors back clean max",
+    "fashion player kiaasa retail submits",
+    "player pngs reva diamond jewellery",
+    "in yaap digital ahead of",
+    "ambani says targeting reliance jio",
+    "reliance jio targets massive",
+    "is shree ram twistex",
+    "gaudium ivf announce",
+    "pngs reva diamond jewellery files",
+    "pngs reva diamond jewellery launches",
+    "max & pngs reva diamond",
+    "cleanmax enviro energy solutions limited",
+    "does clean max enviro energy",
+}
+
+# ── Manual canonical names (always prefer these over fuzzy guesses) ───────────
+MANUAL_NORMALIZE = {
+    # CleanMax variants
+    "Clean Max":                          "CleanMax Enviro Energy",
+    "Clean Max Enviro":                   "CleanMax Enviro Energy",
+    "Clean Max Enviro Energy":            "CleanMax Enviro Energy",
+    "Clean Max Enviro Energy Solutions":  "CleanMax Enviro Energy",
+    "CleanMax":                           "CleanMax Enviro Energy",
+    "CleanMax Enviro":                    "CleanMax Enviro Energy",
+    "Cleanmax":                           "CleanMax Enviro Energy",
+    "Max Enviro Energy Solutions Ltd":    "CleanMax Enviro Energy",
+
+    # YAAP Digital variants
+    "YAAP Digital":                       "Yaap Digital",
+    "YAAP DIGITAL LIMITED":               "Yaap Digital",
+
+    # PNGS Reva variants
+    "PNGS Reva":                          "PNGS Reva Diamond Jewellery",
+    "PNGS Reva Diamond":                  "PNGS Reva Diamond Jewellery",
+    "PNGS Reva Jewellery":               "PNGS Reva Diamond Jewellery",
+    "Reva Diamond":                       "PNGS Reva Diamond Jewellery",
+    "Reva Diamond Jewellery":            "PNGS Reva Diamond Jewellery",
+    "Reva Diamonds":                      "PNGS Reva Diamond Jewellery",
+    "Reva Diamonds Files":               "PNGS Reva Diamond Jewellery",
+    "Reva Jewellery":                     "PNGS Reva Diamond Jewellery",
+
+    # Omnitech
+    "Omnitech":                           "Omnitech Engineering",
+
+    # Gaudium IVF variants
+    "Gaudium":                            "Gaudium IVF",
+    "Gaudium IVF & Women Health":         "Gaudium IVF",
+
+    # Striders Impex
+    "Striders Impex Limited":             "Striders Impex",
+
+    # Accord Transformer
+    "Accord Transformer & Switchgear":    "Accord Transformer",
+
+    # Fractal Analytics
+    "Fractal AI":                         "Fractal Analytics",
+    "Fractal Industries":                 "Fractal Analytics",
+
+    # Shree Ram Twistex
+    "Shree Ram":                          "Shree Ram Twistex",
+
+    # PhonePe
+    "PhonePe Files Draft":                "PhonePe",
+    "Backed PhonePe":                     "PhonePe",
+
+    # Mobilise App
+    "Mobilise App":                       "Mobilise App Lab",
+    "Mobilise App Lab Limited":           "Mobilise App Lab",
+
+    # Women Health
+    "Women Health":                       "Gaudium IVF",
+
+    # ICICI Prudential AMC
+    "ICICI Pru AMC":                      "ICICI Prudential AMC",
+
+    # SBI
+    "SBI Mutual Fund":                    "SBI Funds Management",
+
+    # HDB Financial
+    "HDB Financial":                      "HDB Financial Services",
+
+    # Wakefit
+    "Wakefit Innovations":                "Wakefit",
+
+    # E Transportation
+    "E Transportation":                   "E To E Transportation Infrastructure",
+
+    # National Stock Exchange
+    "National Stock Exchange":            "NSE",
+
+    # Solarworld
+    "Solarworld Energy Solutions":        "Solarworld Energy",
+
+    # Studds
+    "Studds":                             "Studds Accessories",
+
+    # Bonfiglioli
+    "Bonfiglioli Transmissions Limited":  "Bonfiglioli Transmissions",
+
+    # Pride Hotels
+    "Pride Hotels Limited":               "Pride Hotels",
+
+    # Narmadesh
+    "Narmadesh Brass":                    "Narmadesh Brass Industries",
+}
+
+
+# ── Known IPOs ────────────────────────────────────────────────────────────────
+def known_ipos(discovered: list = None) -> Gazetteer:
+    """Gazetteer of the discovered IPO list (the last discovery run's if not given)."""
+    if discovered is None:
+        discovered = load_discovered()
+    return Gazetteer.from_sources(discovered, [NORMALIZE, MANUAL_NORMALIZE], junk=JUNK_NAMES)
@@ -0,0 +1,104 @@
+"""
+nlp/keyword_matcher.py
+Multi-keyword matching in one pass per document (Aho-Corasick).
+
+All keywords go into one trie, so the scan cost depends on the text length,
+not on how many keywords there are. Every occurrence is reported, including
+overlapping ones ("drhp" also yields "rhp"), as (start, keyword) pairs.
+
+Backends:
+- pyahocorasick   C automaton, used when installed (pip install pyahocorasick)
+- fallback        the same trie compiled into a single regex; sre walks it
+                  at each offset and captures the longest keyword starting
+                  there, whose keyword prefixes are the other matches
+
+With word_boundary=True a match only counts when the characters on either
+side of it are not letters or digits ("rhp" no longer matches inside "drhp").
+"""
+
+import re
+
+try:
+    import ahocorasick
+except ImportError:   # the regex fallback gives the same matches
+    ahocorasick = None
+
+_END = ""   # trie key marking the end of a keyword (never a real character)
+
+
+def _build_trie(keywords) -> dict:
+    trie = {}
+    for kw in keywords:
+        node = trie
+        for ch in kw:
+            node = node.setdefault(ch, {})
+        node[_END] = kw
+    return trie
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex matching any keyword in `node`'s subtree (branches split on one character)."""
+    branches = [re.escape(ch) + _trie_pattern(child)
+                for ch, child in sorted(node.items()) if ch != _END]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _END in node:
+        body = "(?:" + body + ")?"
+    return body
+
+
+class KeywordMatcher:
+    def __init__(self, keywords, word_boundary: bool = False, backend: str = None):
+        self.keywords      = sorted({k for k in keywords if k})
+        self.word_boundary = word_boundary
+        self.backend       = backend or ("pyahocorasick" if ahocorasick else "regex")
+
+        if self.backend == "pyahocorasick":
+            if ahocorasick is None:
+                raise ImportError("pyahocorasick is not installed")
+            self._automaton = ahocorasick.Automaton()
+            for kw in self.keywords:
+                self._automaton.add_word(kw, kw)
+            if self.keywords:
+                self._automaton.make_automaton()
+        else:
+            # Zero-width lookahead so one keyword can start inside another
+            body = _trie_pattern(_build_trie(self.keywords))
+            self._starts = re.compile(f"(?=({body}))" if body else r"(?!)")
+            known = set(self.keywords)
+            self._prefixes = {kw: [kw[:i] for i in range(1, len(kw) + 1) if kw[:i] in known]
+                              for kw in self.keywords}
+
+    def _bounded(self, text: str, start: int, end: int) -> bool:
+        return ((start == 0 or not text[start - 1].isalnum())
+                and (end == len(text) or not text[end].isalnum()))
+
+    def find(self, text: str) -> list:
+        """Every keyword occurrence in `text` as (start, keyword), ordered by position."""
+        hits = []
+        if self.backend == "pyahocorasick":
+            if self.keywords:
+                for end, kw in self._automaton.iter(text):
+                    hits.append((end - len(kw) + 1, kw))
+        else:
+            for m in self._starts.finditer(text):
+                start = m.start()
+                hits.extend((start, kw) for kw in self._prefixes[m.group(1)])
+
+        if self.word_boundary:
+            hits = [(s, kw) for s, kw in hits if self._bounded(text, s, s + len(kw))]
+        return sorted(hits)
+
+    def contains(self, text: str) -> bool:
+        """True if any keyword occurs in `text`."""
+        if not self.word_boundary:
+            if self.backend == "pyahocorasick":
+                return self.keywords != [] and next(self._automaton.iter(text), None) is not None
+            return self._starts.search(text) is not None
+        return bool(self.find(text))
+
+
+def format_hits(hits: list) -> str:
+    """[(start, keyword), ...] → "keyword@start;..." for a CSV cell."""
+    return ";".join(f"{kw}@{start}" for start, kw in hits)
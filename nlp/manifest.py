@@ -0,0 +1,135 @@
+"""
+nlp/manifest.py
+Content-hash manifest for incremental reprocessing.
+
+Every cleaned row carries a `row_hash` (digest of its text) that later
+stages pass through unchanged. The manifest remembers, per stage, which
+row hashes it has already processed, plus a hash of each raw file and of
+whole-file inputs. With --incremental a stage works on unseen rows only and
+merges them into its existing output; a full run rebuilds the output and
+resets the stage's record.
+
+Changing a stage's rules (keywords, name maps, model) needs a full run.
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+import storage
+
+MANIFEST_PATH = "data/cache/manifest.json"
+
+
+def text_digest(text: str) -> bytes:
+    """16-byte content key for one text."""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def row_hashes(texts) -> list:
+    return [text_digest(t if isinstance(t, str) else str(t)).hex() for t in texts]
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def ensure_row_hash(df: pd.DataFrame) -> pd.DataFrame:
+    """Add row_hash from `text` for inputs written before the manifest existed."""
+    if "row_hash" not in df.columns:
+        df = df.copy()
+        df["row_hash"] = row_hashes(df["text"].fillna("").astype(str))
+    return df
+
+
+class Manifest:
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self.data = {"files": {}, "stages": {}}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.data = json.load(f)
+        self._sets = {}
+
+    def _stage(self, stage: str) -> dict:
+        return self.data["stages"].setdefault(stage, {"rows": [], "input_hash": None})
+
+    # ── Raw files ─────────────────────────────────────────────────────────────
+    def file_changed(self, path: str) -> bool:
+        return self.data["files"].get(os.path.basename(path)) != file_hash(path)
+
+    def record_files(self, paths: list):
+        self.data["files"] = {os.path.basename(p): file_hash(p) for p in paths}
+
+    # ── Rows ──────────────────────────────────────────────────────────────────
+    def processed(self, stage: str) -> set:
+        if stage not in self._sets:
+            self._sets[stage] = set(self._stage(stage)["rows"])
+        return self._sets[stage]
+
+    def mark_processed(self, stage: str, hashes, reset: bool = False):
+        done = set() if reset else self.processed(stage)
+        done.update(hashes)
+        self._sets[stage] = done
+        self._stage(stage)["rows"] = sorted(done)
+
+    def forget(self, stage: str):
+        self.mark_processed(stage, [], reset=True)
+
+    # ── Whole-file inputs ─────────────────────────────────────────────────────
+    def input_unchanged(self, stage: str, path: str) -> bool:
+        actual, _ = storage.locate(path)
+        return actual is not None and self._stage(stage)["input_hash"] == file_hash(actual)
+
+    def record_input(self, stage: str, path: str):
+        actual, _ = storage.locate(path)
+        self._stage(stage)["input_hash"] = file_hash(actual)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f)
+        os.replace(tmp, self.path)
+
+
+# ── Stage helpers ─────────────────────────────────────────────────────────────
+def rows_to_process(df: pd.DataFrame, stage: str, manifest: Manifest, out_path: str,
+                    incremental: bool) -> pd.DataFrame:
+    """All of `df`, or with --incremental only rows this stage has not seen."""
+    if not incremental:
+        return df
+    if not storage.exists(out_path) or "row_hash" not in storage.columns(out_path):
+        manifest.forget(stage)   # no usable output to merge into; rebuild it
+    todo = df[~df["row_hash"].isin(manifest.processed(stage))]
+    print(f"Incremental: {len(todo)} new rows (of {len(df)})")
+    return todo
+
+
+def stage_output(new_out: pd.DataFrame, todo: pd.DataFrame, current: pd.DataFrame,
+                 stage: str, manifest: Manifest, out_path: str,
+                 incremental: bool) -> pd.DataFrame:
+    """
+    Record `todo` as processed and return the stage's full output.
+
+    Incremental runs keep existing output rows still present in `current`
+    (the stage input) and append `new_out`; rows whose hash vanished
+    upstream are dropped so outputs never outlive their source rows.
+    """
+    manifest.mark_processed(stage, todo["row_hash"], reset=not incremental)
+    if not incremental or not storage.exists(out_path):
+        return new_out
+
+    old = storage.read_table(out_path)
+    if "row_hash" not in old.columns:
+        return new_out
+
+    old = old[old["row_hash"].isin(set(current["row_hash"]))]
+    old = old[~old["row_hash"].isin(set(new_out["row_hash"]))]
+    return pd.concat([old, new_out], ignore_index=True)
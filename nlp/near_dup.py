@@ -0,0 +1,195 @@
+"""
+nlp/near_dup.py
+Near-duplicate detection for cleaned articles — word shingles, MinHash, LSH banding.
+
+Syndicated copies of one story differ by a byline, a timestamp or a trailing
+sentence, so exact dedup on `text` misses them. Each document becomes a
+MinHash signature of its word k-shingles; signatures are cut into bands and
+documents that share a band bucket (and whose signatures agree on at least
+`threshold` of their slots) are merged with union-find. Bucketing is a sort
+per band, so cost grows ~linearly with the corpus plus the pairwise checks
+inside shared buckets, which stay small once exact duplicates are gone.
+
+Off by default: cleaning.py only runs it with --near-dup.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from parallel import parallel_map
+
+NEAR_DUP_THRESHOLD = 0.8   # estimated Jaccard of word shingles at which two texts are copies
+NUM_PERM           = 128   # MinHash signature length
+SHINGLE_SIZE       = 5     # words per shingle
+
+_PRIME = np.uint64(4294967291)          # largest prime < 2**32
+_MIX   = np.uint64(0x9E3779B97F4A7C15)  # 64-bit golden-ratio multiplier
+
+
+def lsh_params(threshold: float, num_perm: int) -> tuple:
+    """
+    (bands, rows) with bands * rows <= num_perm minimising the area of
+    missed pairs above `threshold` plus spurious candidates below it.
+    """
+    below = np.linspace(0.0, threshold, 200)
+    above = np.linspace(threshold, 1.0, 200)
+    best  = None
+    for rows in range(1, num_perm + 1):
+        for bands in range(1, num_perm // rows + 1):
+            false_pos = (1 - (1 - below ** rows) ** bands).mean() * threshold
+            false_neg = ((1 - above ** rows) ** bands).mean() * (1 - threshold)
+            if best is None or false_pos + false_neg < best[0]:
+                best = (false_pos + false_neg, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """Signatures for cleaned (space-separated, lowercase) texts."""
+
+    def __init__(self, num_perm: int = NUM_PERM, shingle_size: int = SHINGLE_SIZE,
+                 seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm     = num_perm
+        self.shingle_size = shingle_size
+        # a, b < 2**32 and x < 2**32 keep a*x + b inside uint64
+        self.a = rng.integers(1, 2**32 - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, 2**32 - 1, size=num_perm, dtype=np.uint64)
+        self.weights = (_MIX * np.arange(1, shingle_size + 1, dtype=np.uint64)) | np.uint64(1)
+        self.vocab   = {}   # token → stable 63-bit hash, so signatures compare across runs
+
+    def _shingles(self, text: str) -> np.ndarray:
+        tokens = text.split()
+        if not tokens:
+            return np.empty(0, dtype=np.uint64)
+
+        vocab = self.vocab
+        get   = vocab.get
+        ids   = [get(t) for t in tokens]
+        if None in ids:
+            for i, v in enumerate(ids):
+                if v is None:
+                    digest = hashlib.blake2b(tokens[i].encode(), digest_size=8).digest()
+                    ids[i] = vocab[tokens[i]] = int.from_bytes(digest, "little") >> 1
+        h = np.array(ids, dtype=np.uint64) * _MIX
+        h ^= h >> np.uint64(29)
+
+        k = min(self.shingle_size, len(tokens))
+        n = len(tokens) - k + 1
+        acc = np.zeros(n, dtype=np.uint64)
+        for j in range(k):
+            acc += h[j : j + n] * self.weights[j]
+        return np.unique(acc >> np.uint64(32))
+
+    def signature(self, text: str):
+        """uint32 signature, or None for a text with no tokens."""
+        shingles = self._shingles(text)
+        if not len(shingles):
+            return None
+        hashed = (shingles[:, None] * self.a + self.b) % _PRIME
+        return hashed.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts) -> tuple:
+        """(signature matrix, mask of rows that had tokens) for a batch of texts."""
+        texts = list(texts)
+        sigs  = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        valid = np.zeros(len(texts), dtype=bool)
+        for i, text in enumerate(texts):
+            sig = self.signature(text if isinstance(text, str) else "")
+            if sig is not None:
+                sigs[i]  = sig
+                valid[i] = True
+        return sigs, valid
+
+
+def _signature_list(texts: list) -> list:
+    hasher = MinHasher()
+    return [hasher.signature(t if isinstance(t, str) else "") for t in texts]
+
+
+def signatures(texts, workers: int = 1) -> tuple:
+    """MinHasher().signatures(texts), spread over `workers` processes."""
+    sig_list = parallel_map(_signature_list, texts, workers)
+    sigs  = np.zeros((len(sig_list), NUM_PERM), dtype=np.uint32)
+    valid = np.array([s is not None for s in sig_list], dtype=bool)
+    for i, s in enumerate(sig_list):
+        if s is not None:
+            sigs[i] = s
+    return sigs, valid
+
+
+def _find(parent: np.ndarray, i: int) -> int:
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+
+def cluster_signatures(sigs: np.ndarray, valid: np.ndarray = None,
+                       threshold: float = NEAR_DUP_THRESHOLD) -> tuple:
+    """
+    (cluster_id, cluster_size) arrays for rows of `sigs`.
+
+    cluster_id is the row number of the cluster's first member, so keeping
+    rows where cluster_id == row keeps the earliest copy of every story.
+    Rows with valid == False are singletons.
+    """
+    n = len(sigs)
+    if valid is None:
+        valid = np.ones(n, dtype=bool)
+    parent = np.arange(n)
+
+    bands, rows = lsh_params(threshold, sigs.shape[1]) if n else (0, 0)
+    idx = np.flatnonzero(valid)
+    band_mix = (_MIX * np.arange(1, rows + 1, dtype=np.uint64)) ^ np.uint64(0x2545F4914F6CDD1D)
+
+    for band in range(bands):
+        # One 64-bit key per band; a rare collision is caught by the check below
+        chunk = sigs[idx, band * rows : (band + 1) * rows].astype(np.uint64)
+        keys  = (chunk * band_mix[:rows]).sum(axis=1)
+
+        order  = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.ones(len(order) + 1, dtype=bool)
+        starts[1:-1] = sorted_keys[1:] != sorted_keys[:-1]
+        bounds = np.flatnonzero(starts)
+        multi  = np.flatnonzero(np.diff(bounds) > 1)
+        if not len(multi):
+            continue
+
+        # Compare every pair in a bucket, not just each member with the first:
+        # B ~ A and B ~ C must join C even when C is too far from A
+        for lo, hi in zip(bounds[multi], bounds[multi + 1]):
+            members = idx[order[lo:hi]]
+            for k in range(len(members) - 1):
+                x, rest = members[k], members[k + 1:]
+                agree = (sigs[rest] == sigs[x]).mean(axis=1) >= threshold
+                for y in rest[agree]:
+                    rx, ry = _find(parent, x), _find(parent, y)
+                    if rx != ry:
+                        parent[max(rx, ry)] = min(rx, ry)
+
+    roots = np.array([_find(parent, i) for i in range(n)], dtype=np.int64)
+    # Roots are each component's smallest row, because unions keep the smaller root
+    sizes = np.bincount(roots, minlength=n)[roots] if n else np.zeros(0, dtype=np.int64)
+    return roots, sizes
+
+
+# ── Signature cache ───────────────────────────────────────────────────────────
+def save_signatures(path: str, keys, sigs: np.ndarray, valid: np.ndarray):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, keys=np.asarray(keys, dtype=str), sigs=sigs, valid=valid)
+    os.replace(tmp, path)
+
+
+def load_signatures(path: str) -> dict:
+    """key → (signature, valid); empty if the cache is missing."""
+    if not os.path.exists(path):
+        return {}
+    with np.load(path) as data:
+        return {k: (s, v) for k, s, v in zip(data["keys"].tolist(), data["sigs"], data["valid"])}
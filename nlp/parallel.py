@@ -0,0 +1,55 @@
+"""
+nlp/parallel.py
+Process-pool execution for the row-wise NLP transforms.
+
+The input is cut into `workers` contiguous slices; each slice goes to its
+own process and the results are concatenated in slice order, so output order
+(and content) is identical to a serial call. The transform must be a
+module-level function (it is pickled by reference).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+WORKERS        = (len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity")
+                  else os.cpu_count() or 1)
+MIN_PER_WORKER = 2_000   # below this many items per process, run serially
+
+
+def partitions(n: int, parts: int) -> list:
+    """`parts` contiguous (start, stop) ranges covering range(n), sizes differing by at most one."""
+    parts = max(1, min(parts, n))
+    step, extra = divmod(n, parts)
+    bounds, start = [], 0
+    for i in range(parts):
+        stop = start + step + (1 if i < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def parallel_map(func, items, workers: int = WORKERS) -> list:
+    """
+    func(list_slice) → list of results, applied over `items` in parallel.
+
+    Falls back to one in-process call when there is too little work to
+    pay for starting processes.
+    """
+    items   = list(items)
+    workers = min(workers, len(items) // MIN_PER_WORKER)
+    if workers <= 1:
+        return list(func(items))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(func, items[start:stop])
+                   for start, stop in partitions(len(items), workers)]
+        out = []
+        for fut in futures:
+            out.extend(fut.result())
+    return out
+
+
+def add_workers_arg(parser):
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="processes for row-wise transforms (1 = serial)")
+    return parser
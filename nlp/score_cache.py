@@ -0,0 +1,108 @@
+"""
+nlp/score_cache.py
+Persistent cache of FinBERT probabilities, keyed by content.
+
+- One SQLite file under data/cache/
+- Key = sha256(model id | max length | text), so an edited article, a
+  different model or a different truncation length is a miss — nothing
+  needs invalidating by hand
+- Stores the raw (unrounded) probabilities; a hit gives exactly what
+  scoring the text again would
+- used_at is refreshed on every hit, so prune() can drop entries no run has
+  needed for a while
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+
+CACHE_PATH = "data/cache/sentiment_scores.sqlite"
+_SQL_CHUNK = 500   # keys per IN (...) query, under SQLite's variable limit
+
+
+def score_key(text: str, model_id: str, max_length: int) -> bytes:
+    raw = f"{model_id}|{max_length}|{text}".encode("utf-8", "surrogatepass")
+    return hashlib.sha256(raw).digest()
+
+
+class ScoreCache:
+    def __init__(self, path: str = CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path   = path
+        self.hits   = 0
+        self.misses = 0
+
+        self._db = sqlite3.connect(path)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS scores (
+                key        BLOB PRIMARY KEY,
+                model      TEXT,
+                positive   REAL,
+                negative   REAL,
+                neutral    REAL,
+                created_at REAL,
+                used_at    REAL
+            )
+        """)
+        self._db.commit()
+
+    # ── Lookup / store ────────────────────────────────────────────────────────
+    def lookup_many(self, keys: list) -> dict:
+        """{key: (positive, negative, neutral)} for the keys that are cached."""
+        found  = {}
+        unique = list(dict.fromkeys(keys))
+        for i in range(0, len(unique), _SQL_CHUNK):
+            chunk = unique[i:i + _SQL_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            query = f"SELECT key, positive, negative, neutral FROM scores WHERE key IN ({marks})"
+            for key, pos, neg, neu in self._db.execute(query, chunk):
+                found[key] = (pos, neg, neu)
+
+        now = time.time()
+        self._db.executemany("UPDATE scores SET used_at = ? WHERE key = ?",
+                             [(now, k) for k in found])
+        self._db.commit()
+
+        hits = sum(1 for k in keys if k in found)
+        self.hits   += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def store_many(self, model_id: str, entries: list):
+        """entries: [(key, (positive, negative, neutral)), ...]"""
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(key, model_id, float(p[0]), float(p[1]), float(p[2]), now, now)
+             for key, p in entries],
+        )
+        self._db.commit()
+
+    # ── Maintenance ───────────────────────────────────────────────────────────
+    def prune(self, max_idle_days: float = None, keep_model: str = None) -> int:
+        """Drop entries unused for `max_idle_days` and/or scored by another model."""
+        removed = 0
+        if max_idle_days is not None:
+            cutoff   = time.time() - max_idle_days * 86400
+            removed += self._db.execute("DELETE FROM scores WHERE used_at < ?",
+                                        (cutoff,)).rowcount
+        if keep_model is not None:
+            removed += self._db.execute("DELETE FROM scores WHERE model != ?",
+                                        (keep_model,)).rowcount
+        self._db.commit()
+        if removed:
+            self._db.execute("VACUUM")
+        return removed
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate  = self.hits / total if total else 0.0
+        return (f"score cache: {self.hits}/{total} hits ({rate:.1%}), "
+                f"{len(self)} entries in {self.path}")
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,63 @@
+"""
+nlp/sentences.py
+Sentence splitting for sentence-granularity sentiment (sentiment.py).
+
+- strip_html()        raw `text` can be RSS summary HTML (Google News rows:
+                      <a href=...>, <font ...>, &nbsp;); tags become spaces,
+                      block tags become line breaks, entities are decoded
+- split_sentences()   whitespace-normalised sentences, short fragments dropped
+- article_sentences() sentences per article minus boilerplate: sentences found
+                      in at least N articles of a reference corpus. Pass the
+                      whole stage input as the corpus, so an --incremental run
+                      drops exactly what a full run over the same input would
+"""
+
+import html
+import re
+from collections import Counter
+
+MIN_SENTENCE_CHARS = 20
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"'”’)\]]*\s+(?=[A-Z\"'“‘(])|\s*\n\s*")
+_SKIP_BLOCK   = re.compile(r"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+_BREAK_TAG    = re.compile(r"<(?:br|/?p|/div|/li|/h[1-6]|/tr)\b[^>]*>", re.I)
+_TAG          = re.compile(r"<[^>]*>")
+
+
+def strip_html(text: str) -> str:
+    text = str(text)
+    if "<" not in text and "&" not in text:
+        return text
+    text = _SKIP_BLOCK.sub(" ", text)
+    text = _BREAK_TAG.sub("\n", text)
+    text = _TAG.sub(" ", text)
+    return html.unescape(text).replace("\xa0", " ")
+
+
+def split_sentences(text: str) -> list:
+    """Sentences of `text` (HTML stripped); fragments under MIN_SENTENCE_CHARS dropped."""
+    text  = strip_html(text)
+    parts = [" ".join(s.split()) for s in _SENTENCE_END.split(text)]
+    kept  = [s for s in parts if len(s) >= MIN_SENTENCE_CHARS]
+    return kept or [" ".join(text.split())]
+
+
+def boilerplate(articles: list, min_articles: int) -> set:
+    """Sentences appearing in at least `min_articles` of `articles` (lists of sentences)."""
+    spread = Counter(s for sents in articles for s in set(sents))
+    return {s for s, n in spread.items() if n >= min_articles}
+
+
+def article_sentences(texts: list, min_articles: int = 0, corpus: list = None) -> list:
+    """
+    Sentences per text. With min_articles > 0, sentences that appear in that
+    many articles of `corpus` (texts; default `texts` itself) are dropped —
+    unless that would leave an article with nothing to score.
+    """
+    articles = [split_sentences(t) for t in texts]
+    if not min_articles:
+        return articles
+
+    reference = articles if corpus is None else [split_sentences(t) for t in corpus]
+    boiler    = boilerplate(reference, min_articles)
+    return [[s for s in sents if s not in boiler] or sents for sents in articles]
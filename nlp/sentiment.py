@@ -1,24 +1,73 @@
 import pandas as pd
+import numpy as np
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from transformers import BertTokenizer, BertForSequenceClassification
 from torch.nn.functional import softmax
 import torch
 from tqdm import tqdm
 
+import storage
+from manifest import Manifest, ensure_row_hash, rows_to_process, stage_output
+from parallel import WORKERS, partitions
+from score_cache import ScoreCache, score_key
+from sentences import article_sentences
+
 # ── Config ──────────────────────────────────────────────────────────────
 INPUT_PATH  = "data/processed/ipo_tagged_news.csv"
 OUTPUT_PATH = "data/processed/ipo_sentiment_scored.csv"
 MODEL_NAME  = "ProsusAI/finbert"
 BATCH_SIZE  = 8   # keep low for CPU
 MAX_LENGTH  = 512
+
+# Length batching: texts sorted by token count, batches filled up to
+# TOKEN_BUDGET padded tokens (rows × longest row), so short headlines are
+# never padded out to a long article. "fixed" is the old BATCH_SIZE loop.
+BATCHING     = "length"
+TOKEN_BUDGET = 8192
+MAX_BATCH    = 64
+
+# Inference backend: "int8" quantizes every nn.Linear to int8 weights with
+# dynamic activation scaling — faster and ~4x smaller on CPU, slightly
+# different probabilities (check with --agreement)
+BACKENDS = ("fp32", "int8")
+BACKEND  = "fp32"
+
+# Sharded scoring: N processes, each with its own model copy (~440MB fp32)
+# and torch limited to THREADS_PER_WORKER intra-op threads, so workers don't
+# fight over cores. Default threads: the cores split evenly across workers.
+SCORING_WORKERS = 1
+
+SHOW_PROGRESS = True   # off inside shard workers, whose bars would interleave
+
+# Sentence granularity: score every sentence of the raw `text`, HTML stripped
+# (so nothing past MAX_LENGTH tokens is lost), each distinct sentence once per
+# run, and average them per article. Sentences found in BOILERPLATE_ARTICLES
+# or more articles of the whole input (disclaimers, "also read" blurbs) are
+# skipped; 0 keeps them. See nlp/sentences.py.
+GRANULARITY          = "article"
+SENTENCE_WEIGHTING   = "length"   # mean | length (chars) | confidence (1 - neutral)
+BOILERPLATE_ARTICLES = 0
 # ────────────────────────────────────────────────────────────────────────
 
-def load_model():
+def load_model(backend: str = BACKEND):
     print("Loading FinBERT model (first run downloads ~440MB)...")
     tokenizer = BertTokenizer.from_pretrained(MODEL_NAME)
     model     = BertForSequenceClassification.from_pretrained(MODEL_NAME)
     model.eval()
+    if backend == "int8":
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear},
+                                                       dtype=torch.qint8)
+    elif backend != "fp32":
+        raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
     return tokenizer, model
 
+def model_id(backend: str = BACKEND) -> str:
+    """Identity of the scores a backend produces (part of the score cache key)."""
+    return MODEL_NAME if backend == "fp32" else f"{MODEL_NAME}#{backend}"
+
 def get_text_column(df):
     """Auto-detect the right text column."""
     for col in ["clean_text", "text", "summary", "title"]:
@@ -40,28 +89,151 @@ def score_batch(texts, tokenizer, model):
     # FinBERT label order: positive=0, negative=1, neutral=2
     return probs
 
-def score_dataframe(df, tokenizer, model, text_col):
-    positives, negatives, neutrals, labels, scores = [], [], [], [], []
+def length_batches(lengths: list, token_budget: int = TOKEN_BUDGET,
+                   max_batch: int = MAX_BATCH) -> list:
+    """
+    Row indices grouped into batches of similar length, shortest first.
+    A batch grows while rows × its longest row stays within `token_budget`
+    (a single row longer than the budget gets a batch of its own).
+    """
+    order   = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    for i in order:
+        # `order` is ascending, so row i is the longest in the batch
+        if current and (len(current) == max_batch
+                        or (len(current) + 1) * lengths[i] > token_budget):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
 
-    texts = df[text_col].fillna("").tolist()
 
-    for i in tqdm(range(0, len(texts), BATCH_SIZE), desc="Scoring sentiment"):
-        batch = texts[i : i + BATCH_SIZE]
-        # Replace empty strings with a placeholder so FinBERT doesn't choke
-        batch = [t if t.strip() else "no text" for t in batch]
-        probs = score_batch(batch, tokenizer, model)
+def score_length_batched(texts, tokenizer, model, token_budget: int = TOKEN_BUDGET,
+                         max_batch: int = MAX_BATCH):
+    """Probabilities for `texts` (original order), scored in length-sorted batches."""
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    probs   = np.zeros((len(texts), 3), dtype=np.float32)
+
+    for batch in tqdm(length_batches(lengths, token_budget, max_batch),
+                      desc="Scoring sentiment", disable=not SHOW_PROGRESS):
+        features = [{k: encoded[k][i] for k in encoded.keys()} for i in batch]
+        inputs   = tokenizer.pad(features, return_tensors="pt")
+        with torch.no_grad():
+            outputs = model(**inputs)
+        probs[batch] = softmax(outputs.logits, dim=1).numpy()
+    return probs
+
+
+def score_fixed_batches(texts, tokenizer, model):
+    probs = []
+    for i in tqdm(range(0, len(texts), BATCH_SIZE), desc="Scoring sentiment",
+                  disable=not SHOW_PROGRESS):
+        probs.extend(score_batch(texts[i : i + BATCH_SIZE], tokenizer, model))
+    return np.asarray(probs, dtype=np.float32).reshape(-1, 3)
+
+
+def score_texts(texts, tokenizer, model, batching: str = BATCHING):
+    if batching == "length":
+        return score_length_batched(texts, tokenizer, model)
+    return score_fixed_batches(texts, tokenizer, model)
+
+
+# ── Sharded scoring ─────────────────────────────────────────────────────────
+_worker_model = None
+
+
+def default_threads(workers: int) -> int:
+    return max(1, WORKERS // max(1, workers))
+
+
+def _init_worker(backend: str, threads: int):
+    global _worker_model, SHOW_PROGRESS
+    SHOW_PROGRESS = False
+    torch.set_num_threads(threads)
+    _worker_model = load_model(backend)
+
+
+def _score_shard(texts: list, batching: str):
+    tokenizer, model = _worker_model
+    return score_texts(texts, tokenizer, model, batching)
+
+
+def score_sharded(texts, batching: str = BATCHING, backend: str = BACKEND,
+                  workers: int = SCORING_WORKERS, threads: int = None):
+    """Split `texts` into `workers` contiguous shards, score them in parallel, merge in order."""
+    threads = threads or default_threads(workers)
+    shards  = partitions(len(texts), workers)
+    print(f"Scoring {len(texts)} texts in {len(shards)} shards "
+          f"({threads} torch threads each)")
+
+    # spawn: a forked child would inherit torch's thread pool state
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=context,
+                             initializer=_init_worker, initargs=(backend, threads)) as pool:
+        futures = [pool.submit(_score_shard, texts[start:stop], batching)
+                   for start, stop in shards]
+        parts = []
+        for n, fut in enumerate(futures, 1):
+            parts.append(fut.result())
+            print(f"  shard {n}/{len(shards)} done")
+    return np.concatenate(parts) if parts else np.zeros((0, 3), dtype=np.float32)
 
-        for p in probs:
-            pos, neg, neu = float(p[0]), float(p[1]), float(p[2])
-            positives.append(round(pos, 4))
-            negatives.append(round(neg, 4))
-            neutrals.append(round(neu, 4))
 
-            label = ["positive", "negative", "neutral"][p.argmax()]
-            labels.append(label)
+def run_model(texts, tokenizer, model, batching: str = BATCHING, backend: str = BACKEND,
+              workers: int = SCORING_WORKERS, threads: int = None):
+    """Probabilities for `texts`, in this process (loading the model if needed) or sharded."""
+    if workers > 1 and len(texts) > 1:
+        return score_sharded(texts, batching, backend, workers, threads)
+    if model is None:
+        tokenizer, model = load_model(backend)
+    return score_texts(texts, tokenizer, model, batching)
 
-            # Compound-style score: +1 fully positive, -1 fully negative
-            scores.append(round(pos - neg, 4))
+
+def score_probs(texts, tokenizer, model, batching: str = BATCHING,
+                cache: ScoreCache = None, backend: str = BACKEND,
+                workers: int = SCORING_WORKERS, threads: int = None):
+    """
+    (positive, negative, neutral) per text. With a `cache`, only texts it has
+    never seen go through the model (loaded on first need if `model` is None).
+    Cache lookups stay in this process; with workers > 1 only the misses are
+    sharded out.
+    """
+    # Replace empty strings with a placeholder so FinBERT doesn't choke
+    texts = [t if t.strip() else "no text" for t in texts]
+
+    if cache is None:
+        probs = run_model(texts, tokenizer, model, batching, backend, workers, threads)
+    else:
+        keys   = [score_key(t, model_id(backend), MAX_LENGTH) for t in texts]
+        cached = cache.lookup_many(keys)
+        todo   = list({k: t for k, t in zip(keys, texts) if k not in cached}.items())
+        if todo:
+            fresh = run_model([t for _, t in todo], tokenizer, model, batching, backend,
+                              workers, threads)
+            cache.store_many(model_id(backend), [(k, p) for (k, _), p in zip(todo, fresh)])
+            cached.update((k, tuple(p)) for (k, _), p in zip(todo, fresh))
+        probs = np.array([cached[k] for k in keys], dtype=np.float32).reshape(-1, 3)
+    return probs
+
+
+def add_sentiment_columns(df, probs):
+    positives, negatives, neutrals, labels, scores = [], [], [], [], []
+
+    for p in probs:
+        pos, neg, neu = float(p[0]), float(p[1]), float(p[2])
+        positives.append(round(pos, 4))
+        negatives.append(round(neg, 4))
+        neutrals.append(round(neu, 4))
+
+        label = ["positive", "negative", "neutral"][p.argmax()]
+        labels.append(label)
+
+        # Compound-style score: +1 fully positive, -1 fully negative
+        scores.append(round(pos - neg, 4))
 
     df = df.copy()
     df["sentiment_label"]    = labels
@@ -71,20 +243,154 @@ def score_dataframe(df, tokenizer, model, text_col):
     df["sentiment_neutral"]  = neutrals
     return df
 
+
+def score_dataframe(df, tokenizer, model, text_col, batching: str = BATCHING,
+                    cache: ScoreCache = None, backend: str = BACKEND,
+                    workers: int = SCORING_WORKERS, threads: int = None):
+    """Add sentiment columns to `df`, one model pass per article (see score_probs)."""
+    texts = df[text_col].fillna("").tolist()
+    probs = score_probs(texts, tokenizer, model, batching, cache, backend, workers, threads)
+    return add_sentiment_columns(df, probs)
+
+
+# ── Sentence granularity ────────────────────────────────────────────────────
+def sentence_weights(sentences: list, probs, weighting: str = SENTENCE_WEIGHTING):
+    if weighting == "length":
+        return np.array([max(len(s), 1) for s in sentences], dtype=np.float64)
+    if weighting == "confidence":
+        return 1.0 - probs[:, 2].astype(np.float64) + 1e-6
+    return np.ones(len(sentences))
+
+
+def score_sentences(df, tokenizer, model, text_col, weighting: str = SENTENCE_WEIGHTING,
+                    boilerplate_articles: int = BOILERPLATE_ARTICLES, corpus: list = None,
+                    **score_kwargs):
+    """
+    Add sentiment columns to `df` from its sentences: each distinct sentence in
+    the batch is scored once, then each article gets the weighted mean of its
+    sentences' probabilities. Boilerplate is counted over `corpus` (texts;
+    default `df`'s own) — pass the whole stage input on incremental runs.
+    """
+    articles = article_sentences(df[text_col].fillna("").tolist(), boilerplate_articles, corpus)
+    unique   = list(dict.fromkeys(s for sents in articles for s in sents))
+    print(f"  → {sum(len(sents) for sents in articles)} sentences kept, "
+          f"{len(unique)} distinct to score")
+    probs  = score_probs(unique, tokenizer, model, **score_kwargs)
+    row_of = {s: i for i, s in enumerate(unique)}
+
+    article_probs = np.zeros((len(articles), 3), dtype=np.float32)
+    for i, sents in enumerate(articles):
+        p = probs[[row_of[s] for s in sents]]
+        w = sentence_weights(sents, p, weighting)
+        article_probs[i] = (p * w[:, None]).sum(axis=0) / w.sum()
+
+    df = add_sentiment_columns(df, article_probs)
+    df["sentence_count"] = [len(sents) for sents in articles]
+    return df
+
+
+def agreement_report(df, text_col, sample: int, batching: str = BATCHING,
+                     backend: str = "int8", seed: int = 0):
+    """Score a reference sample with fp32 and `backend`; print label agreement and speed."""
+    ref = df.sample(min(sample, len(df)), random_state=seed)
+    results, seconds = {}, {}
+    for name in ("fp32", backend):
+        tokenizer, model = load_model(name)
+        start = time.perf_counter()
+        results[name] = score_dataframe(ref, tokenizer, model, text_col, batching)
+        seconds[name] = time.perf_counter() - start
+
+    base, other = results["fp32"], results[backend]
+    agree = (base["sentiment_label"] == other["sentiment_label"]).mean()
+    drift = (base["sentiment_score"] - other["sentiment_score"]).abs()
+    print(f"\nAgreement {backend} vs fp32 on {len(ref)} reference articles:")
+    print(f"  labels agree:      {agree:.2%}")
+    print(f"  score |diff|:      mean {drift.mean():.4f}, max {drift.max():.4f}")
+    print(f"  time:              fp32 {seconds['fp32']:.1f}s, {backend} {seconds[backend]:.1f}s "
+          f"({seconds['fp32'] / max(seconds[backend], 1e-9):.2f}x)")
+    print(pd.crosstab(base["sentiment_label"], other["sentiment_label"],
+                      rownames=["fp32"], colnames=[backend]))
+
 def main():
+    parser = argparse.ArgumentParser(description="Score articles with FinBERT")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only score rows not scored by earlier runs")
+    parser.add_argument("--batching", choices=["length", "fixed"], default=BATCHING,
+                        help="length: sort by token count and fill a token budget; "
+                             "fixed: BATCH_SIZE rows in corpus order")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="score every text, ignoring data/cache/sentiment_scores.sqlite")
+    parser.add_argument("--prune-cache", type=float, metavar="DAYS",
+                        help="drop cached scores no run has used in DAYS days "
+                             "(and those from other models)")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND,
+                        help="fp32, or int8 dynamic quantization of the linear layers")
+    parser.add_argument("--agreement", type=int, metavar="N",
+                        help="compare --backend (int8 if fp32) against fp32 on N "
+                             "sampled articles and exit")
+    parser.add_argument("--workers", type=int, default=SCORING_WORKERS,
+                        help="scoring processes, each loading its own model (1 = in-process)")
+    parser.add_argument("--threads-per-worker", type=int,
+                        help="torch intra-op threads per process "
+                             "(default: available cores / workers)")
+    parser.add_argument("--granularity", choices=["article", "sentence"], default=GRANULARITY,
+                        help="sentence: score each distinct sentence of the raw text once "
+                             "and aggregate per article")
+    parser.add_argument("--sentence-weighting", choices=["mean", "length", "confidence"],
+                        default=SENTENCE_WEIGHTING)
+    parser.add_argument("--boilerplate-articles", type=int, default=BOILERPLATE_ARTICLES,
+                        help="skip sentences that appear in at least this many articles "
+                             "of the whole input (0 = keep all)")
+    args = storage.add_format_arg(parser).parse_args()
+    storage.use(args.format)
+
     print(f"Reading {INPUT_PATH}...")
-    df = pd.read_csv(INPUT_PATH)
-    print(f"  → {len(df)} articles loaded")
+    current = ensure_row_hash(storage.read_table(INPUT_PATH))
+    print(f"  → {len(current)} articles loaded")
+
+    manifest = Manifest()
+    df = rows_to_process(current, "sentiment", manifest, OUTPUT_PATH, args.incremental)
 
     text_col = get_text_column(df)
     print(f"  → Using text column: '{text_col}'")
 
-    tokenizer, model = load_model()
+    if args.agreement:
+        other = args.backend if args.backend != "fp32" else "int8"
+        agreement_report(current, text_col, args.agreement, args.batching, other)
+        return
+
+    print(f"  → Backend: {args.backend}")
+    threads = args.threads_per_worker or default_threads(args.workers)
+    if args.workers <= 1:
+        torch.set_num_threads(threads)
+
+    cache = None if args.no_cache else ScoreCache()
+    if len(df) and args.granularity == "sentence":
+        raw_col = "text" if "text" in df.columns else text_col
+        print(f"  → Sentence scoring over '{raw_col}' ({args.sentence_weighting} weighting)")
+        corpus    = current[raw_col].fillna("").tolist() if args.boilerplate_articles else None
+        df_scored = score_sentences(df, None, None, raw_col, args.sentence_weighting,
+                                    args.boilerplate_articles, corpus, batching=args.batching,
+                                    cache=cache, backend=args.backend,
+                                    workers=args.workers, threads=threads)
+    elif len(df):
+        df_scored = score_dataframe(df, None, None, text_col, args.batching, cache,
+                                    args.backend, args.workers, threads)
+    else:
+        df_scored = df
 
-    df_scored = score_dataframe(df, tokenizer, model, text_col)
+    if cache is not None:
+        print(cache.summary())
+        if args.prune_cache is not None:
+            removed = cache.prune(args.prune_cache, keep_model=model_id(args.backend))
+            print(f"Pruned {removed} cached scores")
+        cache.close()
 
-    df_scored.to_csv(OUTPUT_PATH, index=False)
-    print(f"\n✅ Saved scored data to {OUTPUT_PATH}")
+    df_scored = stage_output(df_scored, df, current, "sentiment", manifest, OUTPUT_PATH,
+                             args.incremental)
+    saved = storage.write_table(df_scored, OUTPUT_PATH)
+    manifest.save()
+    print(f"\n✅ Saved scored data to {saved}")
     print(df_scored[["ipo_name", "sentiment_label", "sentiment_score"]].head(10))
 
 if __name__ == "__main__":
@@ -0,0 +1,216 @@
+"""
+nlp/storage.py
+Storage backend for the data/processed hand-offs between stages.
+
+Stages keep their `.csv` path constants; the run's format decides what is
+actually on disk:
+
+- csv      the original CSV files
+- parquet  `<name>.parquet` next to where the CSV would be — typed columns,
+           column projection and memory-mapped reads
+
+Pick per run with GREYSIGNAL_STORAGE=parquet or a stage's --format flag.
+Reads fall back to the other format when the requested file is missing,
+so a pipeline can be switched over one stage at a time. When both exist the
+newer file is read, so a stale copy left by an earlier run in the other
+format never shadows fresh output; reading the other format prints a warning.
+"""
+
+import os
+
+import pandas as pd
+
+FORMATS = ("csv", "parquet")
+FORMAT  = os.environ.get("GREYSIGNAL_STORAGE", "csv")
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:   # CSV still works without pyarrow
+    pa = pq = None
+
+
+# ── Column types for Parquet; anything else is inferred ──────────────────────
+# Integer columns are written as pandas nullable ints in both formats: rows
+# from an older file that lacks one come back as NaN after a concat.
+INT_COLUMNS = {
+    "dup_cluster_size": "Int32",
+    "keyword_hits":     "Int32",
+    "sentence_count":   "Int32",
+    "article_count":    "Int64",
+    "positive_count":   "Int64",
+    "negative_count":   "Int64",
+    "neutral_count":    "Int64",
+}
+
+
+def _schema() -> dict:
+    string_cols = [
+        "source", "url", "title", "summary", "text", "full_text", "published",
+        "query", "ipo_hint", "scraped_at", "raw_file", "row_hash", "clean_text",
+        "dup_cluster_id", "keyword_matches", "ipo_name", "ipo_mentions",
+        "ipo_tagger", "sentiment_label", "signal",
+    ]
+    types = {c: pa.string() for c in string_cols}
+    types.update({c: pa.int32() if t == "Int32" else pa.int64() for c, t in INT_COLUMNS.items()})
+    types.update({
+        "sentiment_score":     pa.float64(),
+        "sentiment_positive":  pa.float64(),
+        "sentiment_negative":  pa.float64(),
+        "sentiment_neutral":   pa.float64(),
+        "avg_sentiment_score": pa.float64(),
+        "max_sentiment_score": pa.float64(),
+        "min_sentiment_score": pa.float64(),
+        "positive_ratio":      pa.float64(),
+        "negative_ratio":      pa.float64(),
+    })
+    return types
+
+
+SCHEMA = _schema() if pa is not None else {}
+
+
+def use(fmt: str):
+    """Set the format for the rest of this run."""
+    global FORMAT
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown storage format {fmt!r}; expected one of {FORMATS}")
+    if fmt == "parquet" and pq is None:
+        raise ImportError("parquet storage needs pyarrow (pip install pyarrow)")
+    FORMAT = fmt
+
+
+def add_format_arg(parser):
+    parser.add_argument("--format", choices=FORMATS, default=FORMAT,
+                        help="storage for data/processed files "
+                             "(default: $GREYSIGNAL_STORAGE or csv)")
+    return parser
+
+
+def path_for(path: str, fmt: str = None) -> str:
+    """Where `path` (a .csv constant) lives in format `fmt`."""
+    fmt  = fmt or FORMAT
+    base = os.path.splitext(path)[0]
+    return f"{base}.{fmt}"
+
+
+_warned = set()   # fallbacks already reported this run
+
+
+def locate(path: str):
+    """(actual path, format) to read — the newest copy, the run's format on a tie; (None, None) if absent."""
+    found = [(path_for(path, fmt), fmt) for fmt in FORMATS
+             if os.path.exists(path_for(path, fmt)) and (fmt == "csv" or pq is not None)]
+    if not found:
+        return None, None
+
+    actual, fmt = max(found, key=lambda c: (os.path.getmtime(c[0]), c[1] == FORMAT))
+    if fmt != FORMAT and actual not in _warned:
+        _warned.add(actual)
+        print(f"⚠️  Reading {actual}: no newer {FORMAT} copy of {os.path.basename(path)}")
+    return actual, fmt
+
+
+def exists(path: str) -> bool:
+    return locate(path)[0] is not None
+
+
+def columns(path: str) -> list:
+    actual, fmt = locate(path)
+    if actual is None:
+        raise FileNotFoundError(path_for(path))
+    if fmt == "parquet":
+        return pq.read_schema(actual).names
+    return list(pd.read_csv(actual, nrows=0).columns)
+
+
+def read_table(path: str, columns: list = None, memory_map: bool = True) -> pd.DataFrame:
+    """
+    Load a stage file. `columns` projects to those columns (missing ones are
+    ignored), so e.g. aggregation never touches article text.
+    """
+    actual, fmt = locate(path)
+    if actual is None:
+        raise FileNotFoundError(path_for(path))
+
+    if fmt == "parquet":
+        if columns is not None:
+            available = set(pq.read_schema(actual).names)
+            columns = [c for c in columns if c in available]
+        return pq.read_table(actual, columns=columns, memory_map=memory_map).to_pandas()
+
+    if columns is not None:
+        wanted = set(columns)
+        return pd.read_csv(actual, usecols=lambda c: c in wanted)
+    return pd.read_csv(actual)
+
+
+def _nullable_ints(df: pd.DataFrame) -> pd.DataFrame:
+    """INT_COLUMNS as nullable ints — a concat leaves them float/NaN, a str read leaves text."""
+    cols = [c for c, t in INT_COLUMNS.items() if c in df.columns and df[c].dtype != t]
+    if not cols:
+        return df
+    df = df.copy()
+    for col in cols:
+        df[col] = pd.to_numeric(df[col], errors="coerce").round().astype(INT_COLUMNS[col])
+    return df
+
+
+def _arrow_table(df: pd.DataFrame, schema=None):
+    df = df.copy()
+    for col in df.columns:
+        # Mixed object columns (numbers among strings) can't become one Arrow type
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+
+    if schema is None:
+        fields = []
+        inferred = pa.Schema.from_pandas(df, preserve_index=False)
+        for field in inferred:
+            fields.append(pa.field(field.name, SCHEMA.get(field.name, field.type)))
+        schema = pa.schema(fields)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False, safe=False)
+
+
+def write_table(df: pd.DataFrame, path: str) -> str:
+    """Write a whole stage file in the run's format; returns the path written."""
+    out = path_for(path)
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    tmp = out + ".tmp"
+    df  = _nullable_ints(df)
+
+    if FORMAT == "parquet":
+        pq.write_table(_arrow_table(df), tmp, compression="zstd")
+    else:
+        df.to_csv(tmp, index=False)
+    os.replace(tmp, out)
+    return out
+
+
+class TableWriter:
+    """Chunked writer with a fixed column list, for the streaming cleaner."""
+
+    def __init__(self, path: str, columns: list, fmt: str = None):
+        self.fmt     = fmt or FORMAT
+        self.path    = path_for(path, self.fmt)
+        self.columns = columns
+        self.tmp     = self.path + ".tmp"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        if self.fmt == "parquet":
+            self.schema = pa.schema([pa.field(c, SCHEMA.get(c, pa.string())) for c in columns])
+            self.writer = pq.ParquetWriter(self.tmp, self.schema, compression="zstd")
+        else:
+            self.writer = open(self.tmp, "w", encoding="utf-8", newline="")
+            pd.DataFrame(columns=columns).to_csv(self.writer, index=False)
+
+    def write(self, df: pd.DataFrame):
+        df = _nullable_ints(df.reindex(columns=self.columns))
+        if self.fmt == "parquet":
+            self.writer.write_table(_arrow_table(df, self.schema))
+        else:
+            df.to_csv(self.writer, index=False, header=False)
+
+    def close(self):
+        self.writer.close()
+        os.replace(self.tmp, self.path)
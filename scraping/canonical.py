@@ -0,0 +1,175 @@
+"""
+scraping/canonical.py
+
+Crawl-time duplicate suppression.
+
+- canonical_url()  strips tracking parameters, fragments and host/scheme noise
+                   (a comparison key only: pages are fetched and stored under
+                   the link as found)
+- normalize_host() lowercase host without "www.", for per-host lookups
+- url_key()        stable dedup key; Google News redirect links are decoded to
+                   the publisher URL they point at when the id carries it
+- TitleDeduper     drops near-identical headlines within one crawl
+                   (token-set Jaccard with prefix filtering, so each new title
+                   is only compared against titles that can possibly match)
+"""
+
+import base64
+import binascii
+import math
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid",
+    "oc", "ocid", "ref", "ref_src", "refsrc", "cmpid", "icid", "_ga",
+    "at_medium", "at_campaign", "s_cid", "ito", "sref", "amp",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+GOOGLE_NEWS_HOST = "news.google.com"
+_ARTICLE_ID_RE   = re.compile(r"/(?:rss/)?articles/([A-Za-z0-9_-]+)")
+_URL_BYTES_RE    = re.compile(rb"https?://[\x21-\x7e]+")
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+def normalize_host(host: str) -> str:
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def canonical_url(url: str) -> str:
+    """Same page → same string: lowercase host, no www/fragment/tracking, sorted query."""
+    if not isinstance(url, str) or not url.strip():
+        return ""
+
+    parts = urlsplit(url.strip())
+    host  = normalize_host(parts.netloc)
+
+    path = parts.path or "/"
+    if path.endswith("/amp"):
+        path = path[:-4] or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not _is_tracking(k))
+
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def decode_google_news_url(url: str):
+    """
+    Publisher URL embedded in a news.google.com/rss/articles/<id> link, or None.
+
+    Older ids are base64url-encoded protobuf with the target URL as a
+    length-prefixed string field; newer opaque ids can't be decoded offline.
+    """
+    m = _ARTICLE_ID_RE.search(urlsplit(url).path)
+    if not m:
+        return None
+
+    article_id = m.group(1)
+    try:
+        raw = base64.urlsafe_b64decode(article_id + "=" * (-len(article_id) % 4))
+    except (ValueError, binascii.Error):
+        return None
+
+    # field 4 (0x22), varint length, then the URL bytes
+    if len(raw) > 3 and raw[2] == 0x22:
+        length, shift, pos = 0, 0, 3
+        while pos < len(raw):
+            byte = raw[pos]
+            length |= (byte & 0x7F) << shift
+            pos += 1
+            if not byte & 0x80:
+                break
+            shift += 7
+        candidate = raw[pos : pos + length]
+        if candidate.startswith((b"http://", b"https://")):
+            return candidate.decode("utf-8", errors="ignore")
+
+    m = _URL_BYTES_RE.search(raw)
+    return m.group(0).decode("ascii") if m else None
+
+
+def url_key(url: str) -> str:
+    """Stable dedup key for a crawled link."""
+    if not isinstance(url, str) or not url.strip():
+        return ""
+
+    if urlsplit(url).netloc.lower() == GOOGLE_NEWS_HOST:
+        target = decode_google_news_url(url)
+        if target:
+            return canonical_url(target)
+        m = _ARTICLE_ID_RE.search(urlsplit(url).path)
+        if m:
+            return f"gnews:{m.group(1)}"
+
+    return canonical_url(url)
+
+
+# ── Near-duplicate titles ─────────────────────────────────────────────────────
+_PUBLISHER_SUFFIX_RE = re.compile(r"\s+[-|–—]\s+[^-|–—]{2,60}$")
+_TITLE_TOKEN_RE      = re.compile(r"[a-z0-9]+")
+
+TITLE_THRESHOLD  = 0.9   # token-set Jaccard at or above this counts as a duplicate
+MIN_FUZZY_TOKENS = 4     # shorter titles are only deduplicated on exact match
+
+
+def title_tokens(title: str) -> list:
+    """Sorted unique tokens of a headline, minus any ' - Publisher' suffix."""
+    if not isinstance(title, str):
+        return []
+    title = _PUBLISHER_SUFFIX_RE.sub("", title.strip())
+    return sorted(set(_TITLE_TOKEN_RE.findall(title.lower())))
+
+
+class TitleDeduper:
+    def __init__(self, threshold: float = TITLE_THRESHOLD):
+        self.threshold = threshold
+        self.titles    = []   # token sets of accepted titles
+        self.exact     = set()
+        self.index     = {}   # prefix token → ids of titles with it in their prefix
+        self.checked   = 0
+        self.dropped   = 0
+
+    def _prefix(self, tokens: list) -> list:
+        keep = len(tokens) - math.ceil(self.threshold * len(tokens)) + 1
+        return tokens[:keep]
+
+    def seen(self, title: str) -> bool:
+        """True if `title` duplicates one already accepted; otherwise accept it."""
+        self.checked += 1
+        tokens = title_tokens(title)
+        if not tokens:
+            return False
+
+        key = " ".join(tokens)
+        if key in self.exact:
+            self.dropped += 1
+            return True
+
+        token_set = set(tokens)
+        if len(tokens) >= MIN_FUZZY_TOKENS:
+            prefix = self._prefix(tokens)
+            candidates = set()
+            for tok in prefix:
+                candidates.update(self.index.get(tok, ()))
+            for cid in candidates:
+                other = self.titles[cid]
+                if len(token_set & other) / len(token_set | other) >= self.threshold:
+                    self.dropped += 1
+                    return True
+
+            tid = len(self.titles)
+            self.titles.append(token_set)
+            for tok in prefix:
+                self.index.setdefault(tok, []).append(tid)
+
+        self.exact.add(key)
+        return False
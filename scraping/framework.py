@@ -0,0 +1,208 @@
+"""
+scraping/framework.py
+
+Common plumbing for every scraper:
+
+- Source        base class each scraper implements; crawl() yields
+                (work_unit, rows) batches as they finish
+- CrawlContext  the shared session, HTTP cache, per-host rate limiter and
+                URL index (keyed on canonical URLs) handed to every source
+- run_sources   runs any number of sources concurrently and streams each one's
+                rows to data/raw/ in the unified RAW_COLUMNS schema, with a
+                checkpoint so an interrupted crawl resumes where it stopped
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from canonical import url_key
+from http_cache import HttpCache
+from http_client import POOL_SIZE, make_session
+from rate_limit import HostRateLimiter
+from raw_store import Checkpoint, RowWriter, existing_urls
+from url_index import UrlIndex
+
+RAW_DIR = "data/raw"
+
+# Every raw CSV has exactly these columns, in this order.
+# `text` is always the best body text the source has.
+RAW_COLUMNS = [
+    "source", "url", "title", "summary", "text",
+    "published", "query", "ipo_hint", "scraped_at",
+]
+
+DEFAULT_RATE = 2.0   # requests/second per host unless a source overrides it
+CHUNK_ROWS   = 200   # rows buffered before each append to disk
+
+
+class CrawlAborted(Exception):
+    """Raised by a source that cannot proceed (e.g. blocked on its index page)."""
+
+
+def to_raw(row: dict) -> dict:
+    out = {col: row.get(col, "") for col in RAW_COLUMNS}
+    if not out["scraped_at"]:
+        out["scraped_at"] = datetime.utcnow().isoformat()
+    return out
+
+
+class CrawlContext:
+    """Shared resources for one run. Everything here is thread-safe."""
+
+    def __init__(self, use_cache: bool = True, incremental: bool = False,
+                 pool_size: int = POOL_SIZE, rate: float = DEFAULT_RATE,
+                 rate_overrides: dict = None, gate: bool = True):
+        self.session     = make_session(pool_size)
+        self.pool_size   = pool_size
+        self.cache       = HttpCache() if use_cache else None
+        self.limiter     = HostRateLimiter(rate, overrides=rate_overrides)
+        self.url_index   = UrlIndex()
+        self.incremental = incremental
+        self.gate        = gate    # drop links that fail the IPO relevance check before fetching
+        self.stop        = threading.Event()   # set on Ctrl-C; sources stop at the next batch
+
+    def get(self, url: str, url_class: str = None, **kwargs):
+        """Rate-limited, cached GET on the shared session."""
+        kwargs.setdefault("timeout", 20)
+        if self.cache is not None:
+            return self.cache.get(self.session, url, url_class=url_class,
+                                  limiter=self.limiter, **kwargs)
+        self.limiter.acquire(url)
+        return self.session.get(url, **kwargs)
+
+    def is_stored(self, url: str) -> bool:
+        """True if an incremental run should skip this URL (compared by canonical key)."""
+        return self.incremental and url_key(url) in self.url_index
+
+
+class Source:
+    """
+    A scraper plugin. Subclasses set `name` and `out_file` and implement
+    crawl(), a generator of (work_unit, rows) pairs:
+
+    - work_unit is a string key (a query, an article URL...) that is
+      checkpointed once its rows are on disk; units in `done` were finished
+      by an earlier, interrupted run and must be skipped
+    - rows are dicts with any subset of RAW_COLUMNS
+
+    `rate_limits` maps host → requests/second for hosts this source hits.
+    """
+
+    name        = ""
+    out_file    = ""
+    rate_limits = {}
+
+    @property
+    def out_path(self) -> str:
+        return os.path.join(RAW_DIR, self.out_file)
+
+    def crawl(self, ctx: CrawlContext, done: set = frozenset()):
+        raise NotImplementedError
+
+
+def _run_one(source: Source, ctx: CrawlContext, restart: bool = False,
+             chunk_rows: int = CHUNK_ROWS) -> int:
+    start      = time.time()
+    checkpoint = Checkpoint(source.name)
+    resuming   = checkpoint.unfinished and not restart
+
+    if resuming:
+        print(f"[{source.name}] resuming interrupted crawl "
+              f"({len(checkpoint.done)} work units already done)")
+    else:
+        checkpoint.start()
+
+    def on_flush(rows, units):
+        ctx.url_index.add_many((url_key(r["url"]) for r in rows), source.name)
+        checkpoint.mark_done(units)
+
+    writer = RowWriter(source.out_path, RAW_COLUMNS,
+                       append=resuming or ctx.incremental, chunk_rows=chunk_rows,
+                       on_flush=on_flush,
+                       skip_urls=existing_urls(source.out_path) if resuming else None)
+
+    batches = source.crawl(ctx, frozenset(checkpoint.done))
+    try:
+        for unit, rows in batches:
+            writer.write([to_raw(r) for r in rows], unit)
+            if ctx.stop.is_set():
+                batches.close()
+                writer.flush()
+                print(f"[{source.name}] stopped after {writer.rows_written} rows "
+                      f"— rerun to resume")
+                return writer.rows_written
+    except CrawlAborted as e:
+        writer.flush()
+        print(f"[{source.name}] crawl aborted ({e}) — rerun to resume")
+        return writer.rows_written
+    except BaseException:
+        writer.flush()
+        raise
+
+    writer.close()
+    checkpoint.finish()
+    print(f"[{source.name}] saved {writer.rows_written} rows to {source.out_path} "
+          f"in {time.time() - start:.1f}s")
+    return writer.rows_written
+
+
+def run_sources(sources: list, use_cache: bool = True, incremental: bool = False,
+                pool_size: int = POOL_SIZE, rate: float = DEFAULT_RATE,
+                restart: bool = False, chunk_rows: int = CHUNK_ROWS,
+                gate: bool = True) -> dict:
+    """
+    Crawl all `sources` concurrently on one shared context. Returns name → rows saved.
+
+    Rows are streamed to disk every `chunk_rows`. If a source's previous run
+    did not finish, it resumes from its checkpoint unless `restart` is set.
+    """
+    overrides = {}
+    for source in sources:
+        overrides.update(source.rate_limits)
+
+    ctx = CrawlContext(use_cache=use_cache, incremental=incremental,
+                       pool_size=pool_size, rate=rate, rate_overrides=overrides,
+                       gate=gate)
+    if incremental:
+        print(f"Incremental mode: {len(ctx.url_index)} URLs already stored")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(sources))) as pool:
+        futures = {
+            source.name: pool.submit(_run_one, source, ctx, restart, chunk_rows)
+            for source in sources
+        }
+        try:
+            for name, fut in futures.items():
+                try:
+                    results[name] = fut.result()
+                except Exception as e:
+                    print(f"[{name}] failed: {e}")
+                    results[name] = 0
+        except KeyboardInterrupt:
+            print("\nInterrupted — flushing rows and checkpoints...")
+            ctx.stop.set()
+            raise
+
+    if ctx.cache is not None:
+        print(ctx.cache.summary())
+    return results
+
+
+def add_common_args(parser):
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip URLs already stored by earlier runs and append new rows")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="bypass the on-disk HTTP cache in data/cache/http")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE,
+                        help="connections per host in the shared pool")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore an unfinished checkpoint and crawl from scratch")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="rows buffered before each append to disk")
+    parser.add_argument("--no-gate", action="store_true",
+                        help="keep links that fail the pre-fetch IPO relevance check")
+    return parser
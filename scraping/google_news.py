@@ -6,23 +6,24 @@ Step 2: Search Google News for each IPO specifically
 Step 3: Broad queries to catch anything missed
 """
 
-import requests
 import feedparser
-import pandas as pd
-from bs4 import BeautifulSoup
-from datetime import datetime
+import argparse
+import asyncio
+import hashlib
+import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote_plus
 import re 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/122.0.0.0 Safari/537.36"
-    ),
-    "Accept-Language": "en-US,en;q=0.9",
-}
+
+import httpx
+
+from canonical import TitleDeduper, url_key
+from framework import CrawlContext, Source, add_common_args, run_sources
+from html_extract import extract_links
+from relevance import RelevanceGate
+from http_client import async_get, make_async_client
 
 BROAD_QUERIES = [
     "IPO India 2025 2026",
@@ -37,33 +38,32 @@ BROAD_QUERIES = [
     "IPO listing date India",
 ]
 
-rows = []
-seen_urls = set()
-session = requests.Session()
-session.headers.update(HEADERS)
+# ── RSS fetch config ──────────────────────────────────────────────────────────
+RSS_HOST          = "news.google.com"
+RSS_CONCURRENCY   = 8     # max RSS requests in flight (async mode)
+RSS_RATE_PER_HOST = 4.0   # requests/second per host (token bucket)
+RSS_TIMEOUT       = 15
+
+# ── Discovery cache ───────────────────────────────────────────────────────────
+DISCOVERY_CACHE = "data/cache/ipo_discovery.json"
+DISCOVERY_TTL   = 12 * 3600   # the IPO list changes roughly once a day
 
 
 # ── Source 1: Chittorgarh ─────────────────────────────────────────────────────
-def fetch_from_chittorgarh() -> list:
+def fetch_from_chittorgarh(ctx: CrawlContext) -> list:
     ipo_names = []
     url = "https://www.chittorgarh.com/report/ipo-in-india-list-main-board-sme/82/"
 
     try:
-        r = session.get(url, headers=HEADERS, timeout=10)
+        r = ctx.get(url, timeout=10)
         if r.status_code != 200:
             print(f"  Chittorgarh returned {r.status_code}")
             return []
 
-        soup = BeautifulSoup(r.text, "html.parser")
-
         # ONLY grab links that point to actual IPO detail pages
         # These look like: /ipo/company-name-ipo/123/
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            text = a.get_text(strip=True)
-
+        for href, text in extract_links(r.content, r.encoding):
             # Must match the pattern /ipo/something-ipo/NUMBER/
-            import re
             if not re.search(r"/ipo/[\w-]+-ipo/\d+/", href):
                 continue
 
@@ -85,7 +85,7 @@ def fetch_from_chittorgarh() -> list:
     return ipo_names[:60]
 
 # ── Source 2: jugaad-data (NSE Live) ─────────────────────────────────────────
-def fetch_from_jugaad() -> list:
+def fetch_from_jugaad(ctx: CrawlContext) -> list:
     ipo_names = []
 
     try:
@@ -132,19 +132,15 @@ def fetch_from_jugaad() -> list:
 
 
 # ── Source 3: ipowatch.in fallback ───────────────────────────────────────────
-def fetch_from_ipowatch() -> list:
+def fetch_from_ipowatch(ctx: CrawlContext) -> list:
     ipo_names = []
 
     try:
-        r = session.get("https://ipowatch.in/upcoming-ipo-list/", headers=HEADERS, timeout=10)
+        r = ctx.get("https://ipowatch.in/upcoming-ipo-list/", timeout=10)
         if r.status_code != 200:
             return []
 
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        for a in soup.find_all("a", href=True):
-            text = a.get_text(strip=True)
-            href = a["href"]
+        for href, text in extract_links(r.content, r.encoding):
 
             # Only grab links that look like actual IPO pages
             # ipowatch URLs look like: /gaudium-ivf-ipo/ or /bharat-coking-coal-ipo/
@@ -182,101 +178,307 @@ def fetch_from_ipowatch() -> list:
 
 
 # ── Combine & deduplicate IPO names from all sources ─────────────────────────
-def discover_ipos() -> list:
+DISCOVERY_SOURCES = {
+    "chittorgarh": fetch_from_chittorgarh,
+    "jugaad":      fetch_from_jugaad,
+    "ipowatch":    fetch_from_ipowatch,
+}
+
+
+def names_hash(names: list) -> str:
+    return hashlib.sha256("\n".join(names).encode("utf-8")).hexdigest()
+
+
+def load_discovery_cache(ttl: float = DISCOVERY_TTL):
+    """Return the cached discovery payload if it is fresh and intact, else None."""
+    try:
+        with open(DISCOVERY_CACHE, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if names_hash(cached.get("names", [])) != cached.get("sha256"):
+        print("  Discovery cache failed its hash check — ignoring it")
+        return None
+    if time.time() - cached.get("fetched_at", 0) >= ttl:
+        return None
+    return cached
+
+
+def save_discovery_cache(names: list, by_source: dict):
+    os.makedirs(os.path.dirname(DISCOVERY_CACHE), exist_ok=True)
+    payload = {
+        "fetched_at": time.time(),
+        "sha256":     names_hash(names),
+        "sources":    by_source,
+        "names":      names,
+    }
+    tmp_path = DISCOVERY_CACHE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, DISCOVERY_CACHE)
+
+
+def discover_ipos(ctx: CrawlContext, ttl: float = DISCOVERY_TTL, refresh: bool = False) -> list:
+    """
+    Query all discovery sources in parallel and merge their names.
+
+    The merged list is cached for `ttl` seconds, so intraday refreshes skip
+    discovery entirely. Merge order is fixed (chittorgarh, jugaad, ipowatch)
+    no matter which source answers first.
+    """
+    if not refresh:
+        cached = load_discovery_cache(ttl)
+        if cached is not None:
+            age_min = (time.time() - cached["fetched_at"]) / 60
+            print(f"  Using cached IPO list ({len(cached['names'])} names, "
+                  f"{age_min:.0f} min old, sha256 {cached['sha256'][:12]})")
+            return cached["names"]
+
+    with ThreadPoolExecutor(max_workers=len(DISCOVERY_SOURCES)) as pool:
+        futures = {key: pool.submit(fn, ctx) for key, fn in DISCOVERY_SOURCES.items()}
+        by_source = {key: fut.result() for key, fut in futures.items()}
+
     all_names = []
     seen = set()
 
-    for source_fn in [fetch_from_chittorgarh, fetch_from_jugaad, fetch_from_ipowatch]:
-        names = source_fn()
+    for names in by_source.values():
         for name in names:
             if name.lower() not in seen:
                 seen.add(name.lower())
                 all_names.append(name)
 
+    previous = None
+    try:
+        with open(DISCOVERY_CACHE, encoding="utf-8") as f:
+            previous = json.load(f).get("sha256")
+    except (OSError, ValueError):
+        pass
+    if previous == names_hash(all_names):
+        print("  IPO list unchanged since last discovery")
+
+    if all_names:
+        save_discovery_cache(all_names, by_source)
+
     return all_names
 
 
 # ── RSS fetcher ───────────────────────────────────────────────────────────────
-def fetch_rss(query: str, ipo_hint: str = "") -> int:
+def rss_url_for(query: str) -> str:
     encoded = quote_plus(query)
-    rss_url = (
+    return (
         f"https://news.google.com/rss/search?"
         f"q={encoded}&hl=en-IN&gl=IN&ceid=IN:en"
     )
 
-    try:
-        resp = session.get(rss_url, timeout=15)
-        feed = feedparser.parse(resp.text)
-        added = 0
+
+async def _download_rss(ctx: CrawlContext, client: httpx.AsyncClient, query: str,
+                        sem: asyncio.Semaphore):
+    rss_url = rss_url_for(query)
+    entry, hit = ctx.cache.cached(rss_url) if ctx.cache else (None, None)
+    if hit is not None:
+        return hit.text
+
+    async with sem:
+        await ctx.limiter.acquire_async(rss_url)
+        try:
+            if ctx.cache is None:
+                resp = await async_get(client, rss_url)
+                return resp.text
+            try:
+                resp = await async_get(client, rss_url,
+                                       headers=ctx.cache.conditional_headers(entry))
+            except httpx.TransportError as e:
+                if entry is None:
+                    raise
+                return ctx.cache.serve_stale(rss_url, entry, e).text
+            return ctx.cache.finish(rss_url, entry, resp.status_code, resp.headers,
+                                    resp.content, resp.encoding).text
+        except Exception as e:
+            print(f"  RSS error '{query}': {e}")
+            return None
+
+
+async def _download_all(ctx: CrawlContext, queries: list, concurrency: int) -> list:
+    sem = asyncio.Semaphore(concurrency)
+    async with make_async_client(concurrency, RSS_TIMEOUT) as client:
+        return await asyncio.gather(
+            *(_download_rss(ctx, client, q, sem) for q, _ in queries)
+        )
+
+
+class GoogleNewsSource(Source):
+    """
+    Step 1: Auto-discover current/upcoming IPOs
+    Step 2: Search Google News for each IPO specifically
+    Step 3: Broad queries to catch anything missed
+    """
+
+    name     = "google-news"
+    out_file = "google_news_metadata.csv"
+
+    def __init__(self, concurrency: int = RSS_CONCURRENCY, rate: float = RSS_RATE_PER_HOST,
+                 sequential: bool = False, discovery_ttl: float = DISCOVERY_TTL,
+                 refresh_discovery: bool = False):
+        self.concurrency       = concurrency
+        self.sequential        = sequential
+        self.discovery_ttl     = discovery_ttl
+        self.refresh_discovery = refresh_discovery
+        self.rate_limits       = {RSS_HOST: rate}
+        self.seen_urls = set()   # canonical URL keys
+        self.titles    = TitleDeduper()
+        self.relevance = RelevanceGate(self.name)
+        self.dup_urls  = 0
+
+    def feed_rows(self, ctx: CrawlContext, feed_text: str, query: str,
+                  ipo_hint: str = "") -> list:
+        """
+        Parse one RSS response into rows for entries not seen yet.
+
+        Entries are deduplicated on their canonical URL key (tracking params
+        stripped, Google redirect ids decoded) and on near-identical titles,
+        so a story syndicated across queries is kept once.
+        """
+        feed = feedparser.parse(feed_text)
+        rows = []
 
         for entry in feed.entries:
             link = entry.link
-            if link in seen_urls:
+            key  = url_key(link)
+            if key in self.seen_urls:
+                self.dup_urls += 1
+                continue
+            self.seen_urls.add(key)
+            if ctx.is_stored(link):
                 continue
-            seen_urls.add(link)
 
             title   = entry.title
             summary = entry.get("summary", "")
+            if ctx.gate and not self.relevance.passes(title, summary, link):
+                continue
+            if self.titles.seen(title):
+                continue
 
             rows.append({
-                "source":     "google-news",
-                "query":      query,
-                "ipo_hint":   ipo_hint,
-                "title":      title,
-                "summary":    summary,
-                "full_text":  (title + " " + summary).strip(),
-                "url":        link,
-                "published":  entry.get("published", ""),
-                "scraped_at": datetime.utcnow().isoformat()
+                "source":    self.name,
+                "query":     query,
+                "ipo_hint":  ipo_hint,
+                "title":     title,
+                "summary":   summary,
+                "text":      (title + " " + summary).strip(),
+                "url":       link,
+                "published": entry.get("published", ""),
             })
-            added += 1
 
-        return added
+        return rows
+
+    def fetch_rss(self, ctx: CrawlContext, query: str, ipo_hint: str = ""):
+        """Rows for one query, or None if the fetch failed (so it is retried on resume)."""
+        try:
+            resp = ctx.get(rss_url_for(query), timeout=RSS_TIMEOUT)
+            return self.feed_rows(ctx, resp.text, query, ipo_hint)
+
+        except Exception as e:
+            print(f"  RSS error '{query}': {e}")
+            return None
+
+    def fetch_rss_many(self, ctx: CrawlContext, queries: list):
+        """
+        Fetch many (query, ipo_hint) pairs concurrently, yielding (query, rows).
+
+        Queries are downloaded in parallel batches, but feeds are parsed in
+        submission order so `seen_urls` dedup credits each link to the same
+        query a sequential run would, and the output CSV is identical.
+        """
+        batch_size = self.concurrency * 4
+        for i in range(0, len(queries), batch_size):
+            batch = queries[i : i + batch_size]
+            texts = asyncio.run(_download_all(ctx, batch, self.concurrency))
+
+            for (query, ipo_hint), text in zip(batch, texts):
+                if text is None:
+                    yield query, None
+                    continue
+                try:
+                    yield query, self.feed_rows(ctx, text, query, ipo_hint)
+                except Exception as e:
+                    print(f"  RSS error '{query}': {e}")
+                    yield query, None
+
+    def crawl(self, ctx: CrawlContext, done: set = frozenset()):
+        # Step 1: Discover IPOs
+        print("Step 1: Discovering current IPOs from all sources...")
+        ipo_names = discover_ipos(ctx, self.discovery_ttl, refresh=self.refresh_discovery)
+
+        if ipo_names:
+            print(f"\n  Total unique IPOs discovered: {len(ipo_names)}")
+            print(f"  Sample: {ipo_names[:5]}")
+        else:
+            print("  No IPOs discovered — will rely on broad queries only")
+        self.relevance = RelevanceGate(self.name, ipo_names)   # knows this run's IPOs
+
+        # Step 2: Company-specific searches, Step 3: broad queries
+        targeted = [(f"{name} IPO India", name) for name in ipo_names]
+        broad    = [(query, "") for query in BROAD_QUERIES]
+        queries  = [(q, h) for q, h in targeted + broad if q not in done]
+
+        print(f"\nStep 2/3: {len(targeted)} targeted + {len(broad)} broad RSS queries")
+        if len(queries) < len(targeted) + len(broad):
+            print(f"  {len(targeted) + len(broad) - len(queries)} already done in the interrupted run")
+
+        if self.sequential:
+            results = ((q, self.fetch_rss(ctx, q, ipo_hint=h)) for q, h in queries)
+        else:
+            print(f"  concurrency={self.concurrency}, "
+                  f"{self.rate_limits[RSS_HOST]}/s per host")
+            results = self.fetch_rss_many(ctx, queries)
+
+        total = 0
+        for i, (query, rows) in enumerate(results):
+            if rows is None:
+                continue
+            total += len(rows)
+            print(f"  [{i+1}/{len(queries)}] '{query}' → {len(rows)} new articles")
+            yield query, rows
 
-    except Exception as e:
-        print(f"  RSS error '{query}': {e}")
-        return 0
+        print(f"\n  {total} articles from {len(ipo_names)} IPO searches "
+              f"+ {len(BROAD_QUERIES)} broad queries")
+        print(f"  Duplicates dropped: {self.dup_urls} by URL, "
+              f"{self.titles.dropped} by near-identical title")
+        if ctx.gate:
+            print("  " + self.relevance.summary())
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
+def add_source_args(parser):
+    parser.add_argument("--sequential", action="store_true",
+                        help="fetch RSS queries one at a time instead of concurrently")
+    parser.add_argument("--concurrency", type=int, default=RSS_CONCURRENCY,
+                        help="max RSS requests in flight")
+    parser.add_argument("--rss-rate", type=float, default=RSS_RATE_PER_HOST,
+                        help="requests/second allowed against Google News")
+    parser.add_argument("--refresh-discovery", action="store_true",
+                        help="ignore the cached IPO list and re-scrape all discovery sources")
+    parser.add_argument("--discovery-ttl", type=float, default=DISCOVERY_TTL,
+                        help="seconds a cached IPO list stays valid")
+    return parser
+
+
+def source_from_args(args) -> GoogleNewsSource:
+    return GoogleNewsSource(concurrency=args.concurrency, rate=args.rss_rate,
+                            sequential=args.sequential,
+                            discovery_ttl=args.discovery_ttl,
+                            refresh_discovery=args.refresh_discovery)
+
+
 def main():
-    # Step 1: Discover IPOs
-    print("Step 1: Discovering current IPOs from all sources...")
-    ipo_names = discover_ipos()
-
-    if ipo_names:
-        print(f"\n  Total unique IPOs discovered: {len(ipo_names)}")
-        print(f"  Sample: {ipo_names[:5]}")
-    else:
-        print("  No IPOs discovered — will rely on broad queries only")
-
-    # Step 2: Company-specific searches
-    print(f"\nStep 2: Fetching targeted news for {len(ipo_names)} IPOs...")
-    for i, name in enumerate(ipo_names):
-        query = f"{name} IPO India"
-        count = fetch_rss(query, ipo_hint=name)
-        print(f"  [{i+1}/{len(ipo_names)}] {name} → {count} new articles")
-        time.sleep(0.5)
-
-    # Step 3: Broad queries
-    print(f"\nStep 3: Running {len(BROAD_QUERIES)} broad queries...")
-    for query in BROAD_QUERIES:
-        count = fetch_rss(query)
-        print(f"  '{query}' → {count} new articles")
-        time.sleep(0.5)
-
-    # Save
-    df = pd.DataFrame(rows)
-    os.makedirs("data/raw", exist_ok=True)
-    out_path = "data/raw/google_news_metadata.csv"
-    df.to_csv(out_path, index=False)
-
-    print(f"\n{'='*50}")
-    print(f"Total articles:  {len(df)}")
-    print(f"IPOs searched:   {len(ipo_names)}")
-    print(f"Saved to:        {out_path}")
-    print(f"{'='*50}")
+    parser = argparse.ArgumentParser(description="Google News IPO scraper")
+    args = add_common_args(add_source_args(parser)).parse_args()
+    run_sources([source_from_args(args)], use_cache=not args.no_cache,
+                incremental=args.incremental, pool_size=args.pool_size,
+                restart=args.restart, chunk_rows=args.chunk_rows,
+                gate=not args.no_gate)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
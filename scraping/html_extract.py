@@ -0,0 +1,91 @@
+"""
+scraping/html_extract.py
+
+Targeted HTML extraction on top of lxml.
+
+The scrapers only ever read <h1>, <meta property="article:published_time">,
+<p> and <a href>. Instead of building a BeautifulSoup tree and searching it,
+we let libxml2 parse the raw response bytes and only visit those tags — the
+same idea as bs4's SoupStrainer, minus the Python-level tree. Passing bytes
+means the page is decoded once, inside the C parser.
+
+Text is flattened the same way the old bs4 code did it:
+  get_text(strip=True)       → text_of(el)
+  get_text(" ", strip=True)  → text_of(el, " ")
+"""
+
+import io
+
+from lxml import etree
+
+ARTICLE_TAGS = ("h1", "meta", "p")
+_SKIP_TAGS   = ("script", "style")
+
+
+def _parser_kwargs(encoding: str = None) -> dict:
+    kwargs = {"events": ("end",), "html": True, "recover": True, "no_network": True}
+    if encoding:
+        kwargs["encoding"] = encoding
+    return kwargs
+
+
+def _strings(el):
+    """Text nodes under `el` in document order, minus script/style bodies and comments."""
+    if el.text:
+        yield el.text
+    for child in el:
+        # Comments and PIs have a non-string tag; their tails are still page text
+        if isinstance(child.tag, str) and child.tag not in _SKIP_TAGS:
+            yield from _strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def text_of(el, sep: str = "") -> str:
+    # Walk the pieces rather than strip_elements(): stripping a <script> merges
+    # its tail into the preceding text, so "x<script/>y" would lose its separator
+    return sep.join(s.strip() for s in _strings(el) if s.strip())
+
+
+def extract_article(content: bytes, encoding: str = None) -> dict:
+    """
+    Pull title, published time and paragraph texts out of an article page.
+    Returns {"title": str, "published": str, "paragraphs": [str, ...]}.
+    """
+    title, published, paragraphs = None, "", []
+    if not content:
+        return {"title": "", "published": "", "paragraphs": []}
+
+    try:
+        for _, el in etree.iterparse(io.BytesIO(content), tag=ARTICLE_TAGS,
+                                     **_parser_kwargs(encoding)):
+            if el.tag == "p":
+                paragraphs.append(text_of(el, " "))
+            elif el.tag == "h1":
+                if title is None:
+                    title = text_of(el)
+            elif (not published
+                  and el.get("property") == "article:published_time"
+                  and el.get("content")):
+                published = el.get("content")
+    except etree.XMLSyntaxError:
+        pass  # keep whatever was recovered before the parser gave up
+
+    return {"title": title or "", "published": published, "paragraphs": paragraphs}
+
+
+def extract_links(content: bytes, encoding: str = None) -> list:
+    """Return [(href, anchor_text), ...] for every <a href> on the page."""
+    links = []
+    if not content:
+        return links
+
+    try:
+        for _, el in etree.iterparse(io.BytesIO(content), tag="a",
+                                     **_parser_kwargs(encoding)):
+            href = el.get("href")
+            if href is not None:
+                links.append((href, text_of(el)))
+    except etree.XMLSyntaxError:
+        pass
+    return links
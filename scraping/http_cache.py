@@ -0,0 +1,231 @@
+"""
+scraping/http_cache.py
+
+Persistent on-disk HTTP cache shared by all scrapers.
+
+- Responses live in a single SQLite file under data/cache/http/
+- Each URL is classified as "rss", "listing" or "article" and gets that
+  class's TTL (None = never expires — published articles don't change)
+- Stale entries are revalidated with If-None-Match / If-Modified-Since;
+  a 304 refreshes the entry without downloading the body again
+- If revalidation fails in transport (timeout, DNS, reset), the stale copy
+  is served instead of the error; it is revalidated again next time
+- Total size is capped; least-recently-used entries are evicted first
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+CACHE_DIR       = "data/cache/http"
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Seconds before an entry must be revalidated, per URL class
+TTLS = {
+    "rss":     15 * 60,
+    "listing": 30 * 60,
+    "article": None,
+}
+
+
+def classify_url(url: str) -> str:
+    parts = urlsplit(url)
+    path  = parts.path.lower()
+
+    if "/rss" in path or path.endswith((".xml", ".rss")):
+        return "rss"
+    if path.endswith(".html") or "/article/" in path or "/story/" in path:
+        return "article"
+    return "listing"
+
+
+class CachedResponse:
+    """The subset of requests.Response the scrapers use."""
+
+    def __init__(self, url, status_code, content, headers=None,
+                 encoding=None, from_cache=False):
+        self.url         = url
+        self.status_code = status_code
+        self.content     = content or b""
+        self.headers     = headers or {}
+        self.encoding    = encoding
+        self.from_cache  = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+class HttpCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, ttls: dict = None,
+                 max_bytes: int = MAX_CACHE_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.ttls      = {**TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.hits      = 0
+        self.revalidated = 0
+        self.misses    = 0
+        self.stale_served = 0
+
+        self._lock = threading.Lock()
+        self._db   = sqlite3.connect(os.path.join(cache_dir, "responses.sqlite"),
+                                     check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url           TEXT PRIMARY KEY,
+                url_class     TEXT,
+                status        INTEGER,
+                etag          TEXT,
+                last_modified TEXT,
+                encoding      TEXT,
+                body          BLOB,
+                size          INTEGER,
+                fetched_at    REAL,
+                accessed_at   REAL
+            )
+        """)
+        self._db.commit()
+        self._total_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    # ── Lookup ────────────────────────────────────────────────────────────────
+    def lookup(self, url: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url_class, status, etag, last_modified, encoding, body, fetched_at "
+                "FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ("url_class", "status", "etag", "last_modified", "encoding", "body", "fetched_at")
+        return dict(zip(keys, row))
+
+    def is_fresh(self, entry: dict) -> bool:
+        ttl = self.ttls.get(entry["url_class"])
+        return ttl is None or time.time() - entry["fetched_at"] < ttl
+
+    def conditional_headers(self, entry: dict) -> dict:
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def _from_entry(self, url: str, entry: dict) -> CachedResponse:
+        with self._lock:
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?",
+                             (time.time(), url))
+            self._db.commit()
+        return CachedResponse(url, entry["status"], entry["body"],
+                              encoding=entry["encoding"], from_cache=True)
+
+    def serve_stale(self, url: str, entry: dict, error) -> CachedResponse:
+        """The cached copy, for when revalidating `entry` failed with `error`."""
+        self.stale_served += 1
+        print(f"  cache: serving stale copy of {url} ({type(error).__name__})")
+        return self._from_entry(url, entry)
+
+    # ── Store ─────────────────────────────────────────────────────────────────
+    def finish(self, url: str, entry, status: int, headers, content: bytes,
+               encoding: str = None, url_class: str = None) -> CachedResponse:
+        """
+        Fold a network response into the cache and return what the caller
+        should see: the cached body on 304, the fresh body otherwise.
+        """
+        if status == 304 and entry is not None:
+            self.revalidated += 1
+            now = time.time()
+            with self._lock:
+                self._db.execute(
+                    "UPDATE responses SET fetched_at = ?, accessed_at = ?, "
+                    "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) "
+                    "WHERE url = ?",
+                    (now, now, headers.get("ETag"), headers.get("Last-Modified"), url),
+                )
+                self._db.commit()
+            return CachedResponse(url, entry["status"], entry["body"],
+                                  encoding=entry["encoding"], from_cache=True)
+
+        self.misses += 1
+        if status == 200:
+            self.store(url, status, headers, content, encoding, url_class)
+        return CachedResponse(url, status, content, headers, encoding)
+
+    def store(self, url: str, status: int, headers, content: bytes,
+              encoding: str = None, url_class: str = None):
+        now  = time.time()
+        size = len(content)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE url = ?",
+                                   (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, url_class or classify_url(url), status,
+                 headers.get("ETag"), headers.get("Last-Modified"), encoding,
+                 content, size, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._db.commit()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Drop least-recently-used entries until under 90% of max_bytes."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._db.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall()
+        doomed = []
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((url,))
+            self._total_bytes -= size
+        self._db.executemany("DELETE FROM responses WHERE url = ?", doomed)
+        self._db.commit()
+
+    # ── Fetch ─────────────────────────────────────────────────────────────────
+    def cached(self, url: str):
+        """Return (entry, response). response is set only if the entry is fresh."""
+        entry = self.lookup(url)
+        if entry is not None and self.is_fresh(entry):
+            self.hits += 1
+            return entry, self._from_entry(url, entry)
+        return entry, None
+
+    def get(self, session, url: str, url_class: str = None, limiter=None,
+            **kwargs) -> CachedResponse:
+        """
+        session.get() through the cache. Fresh entries never touch the network;
+        `limiter` (a HostRateLimiter) is only charged for real requests. A
+        network error while revalidating returns the stale entry.
+        """
+        entry, hit = self.cached(url)
+        if hit is not None:
+            return hit
+
+        if limiter is not None:
+            limiter.acquire(url)
+        headers = {**(kwargs.pop("headers", None) or {}), **self.conditional_headers(entry)}
+        try:
+            resp = session.get(url, headers=headers, **kwargs)
+        except OSError as e:   # requests' transport errors are OSErrors
+            if entry is None:
+                raise
+            return self.serve_stale(url, entry, e)
+        encoding = resp.encoding or resp.apparent_encoding
+        return self.finish(url, entry, resp.status_code, resp.headers, resp.content,
+                           encoding, url_class)
+
+    def summary(self) -> str:
+        return (f"cache: {self.hits} fresh hits, {self.revalidated} revalidated (304), "
+                f"{self.misses} downloads, {self.stale_served} stale (network error), "
+                f"{self._total_bytes / 1e6:.1f} MB on disk")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
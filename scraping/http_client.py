@@ -0,0 +1,76 @@
+"""
+scraping/http_client.py
+
+The one place scrapers get HTTP clients from: shared headers, a bounded
+connection pool and a common retry/backoff policy.
+"""
+
+import asyncio
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/122.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.google.com/",
+}
+
+# ── Retry policy ──────────────────────────────────────────────────────────────
+MAX_RETRIES    = 3
+BACKOFF_FACTOR = 1.0                        # sleeps 1s, 2s, 4s between attempts
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_SIZE      = 16
+
+
+def make_session(pool_size: int = POOL_SIZE, retries: int = MAX_RETRIES,
+                 backoff: float = BACKOFF_FACTOR) -> requests.Session:
+    """
+    A requests.Session with one bounded connection pool per host and
+    automatic retries (honouring Retry-After) on throttling and 5xx.
+    Safe to share across threads.
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=("GET", "HEAD"),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          pool_block=True, max_retries=retry)
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def make_async_client(max_connections: int = POOL_SIZE, timeout: float = 15) -> httpx.AsyncClient:
+    limits = httpx.Limits(max_connections=max_connections,
+                          max_keepalive_connections=max_connections)
+    transport = httpx.AsyncHTTPTransport(retries=MAX_RETRIES, limits=limits)
+    return httpx.AsyncClient(headers=HEADERS, timeout=timeout, transport=transport,
+                             follow_redirects=True)
+
+
+async def async_get(client: httpx.AsyncClient, url: str, retries: int = MAX_RETRIES,
+                    backoff: float = BACKOFF_FACTOR, **kwargs) -> httpx.Response:
+    """client.get() with the same status-based retry/backoff as make_session()."""
+    for attempt in range(retries + 1):
+        resp = await client.get(url, **kwargs)
+        if resp.status_code not in RETRY_STATUSES or attempt == retries:
+            return resp
+
+        retry_after = resp.headers.get("Retry-After", "")
+        delay = float(retry_after) if retry_after.isdigit() else backoff * (2 ** attempt)
+        await asyncio.sleep(delay)
+    return resp
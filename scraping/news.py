@@ -1,100 +1,209 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-from datetime import datetime
+import argparse
+import multiprocessing
 import os
-import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin
 
-session = requests.Session()
-
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/122.0.0.0 Safari/537.36"
-    ),
-    "Accept-Language": "en-US,en;q=0.9",
-    "Referer": "https://www.google.com/",
-}
+from canonical import TitleDeduper, canonical_url
+from framework import CrawlAborted, CrawlContext, Source, add_common_args, run_sources
+from html_extract import extract_article, extract_links
+from relevance import RelevanceGate
 
 BASE_URL = "https://www.business-standard.com/markets/ipos"
-
-rows = []
-seen_urls = set()  # ← deduplication
-
-print("Fetching Business Standard IPO page...")
-
-resp = session.get(BASE_URL, headers=HEADERS, timeout=20)
-
-if resp.status_code != 200:
-    print("Blocked on main page, status:", resp.status_code)
-    exit()
-
-soup = BeautifulSoup(resp.text, "html.parser")
-
-links = set()
-
-for a in soup.select("a[href]"):
-    href = a["href"]
-    if "ipo" in href.lower():
-        full_url = urljoin("https://www.business-standard.com", href)
-        # Only article links, skip section/nav links
-        if "/article/" in full_url or "/story/" in full_url or "/news/" in full_url:
-            links.add(full_url)
-
-print(f"Found {len(links)} candidate article links.")
-
-for i, link in enumerate(links):
-    if link in seen_urls:
-        continue
-
-    try:
-        print(f"[{i+1}/{len(links)}] Scraping: {link[:80]}")
-        article_resp = session.get(link, headers=HEADERS, timeout=20)
-
-        if article_resp.status_code != 200:
-            print(f"  Skipped (status {article_resp.status_code})")
-            continue
-
-        article_soup = BeautifulSoup(article_resp.text, "html.parser")
-
-        title = article_soup.find("h1")
-        title_text = title.get_text(strip=True) if title else ""
-
-        # Get published date if available
-        date_tag = article_soup.find("meta", {"property": "article:published_time"})
-        published = date_tag["content"] if date_tag and date_tag.get("content") else ""
-
-        paragraphs = [
-            p.get_text(" ", strip=True)
-            for p in article_soup.find_all("p")
-        ]
-        text = " ".join(paragraphs)
-
-        if len(text) < 300:
-            print("  Skipped (too short)")
-            continue
-
-        rows.append({
-            "source":     "business-standard",
-            "title":      title_text,
-            "url":        link,
-            "published":  published,
-            "text":       text,
-            "scraped_at": datetime.utcnow().isoformat()
-        })
-
-        seen_urls.add(link)
-        time.sleep(1)  # ← polite delay, avoids getting blocked
-
-    except Exception as e:
-        print(f"  Failed: {e}")
-        time.sleep(1)
-
-df = pd.DataFrame(rows)
-os.makedirs("data/raw", exist_ok=True)
-out_path = "data/raw/business_standard_articles.csv"
-df.to_csv(out_path, index=False)
-
-print(f"\nSaved {len(df)} articles to {out_path}")
\ No newline at end of file
+BS_HOST  = "www.business-standard.com"
+
+# ── Crawl config ──────────────────────────────────────────────────────────────
+FETCH_WORKERS   = 8                      # threads for downloads (bounded by the shared pool)
+PARSE_WORKERS   = os.cpu_count() or 2    # processes for HTML parsing; 0 = parse on one thread
+RATE_PER_DOMAIN = 2.0                    # requests/second per domain
+
+
+def parse_article(link: str, content: bytes, encoding: str = None):
+    """CPU-bound half of the crawl; runs on the parse executor."""
+    article = extract_article(content, encoding)
+    text = " ".join(article["paragraphs"])
+
+    if len(text) < 300:
+        return None
+
+    return {
+        "source":    "business-standard",
+        "title":     article["title"],
+        "url":       link,
+        "published": article["published"],
+        "text":      text,
+    }
+
+
+class BusinessStandardSource(Source):
+    """Business Standard IPO section: listing page → article pages."""
+
+    name     = "business-standard"
+    out_file = "business_standard_articles.csv"
+
+    def __init__(self, workers: int = FETCH_WORKERS, parse_workers: int = PARSE_WORKERS,
+                 rate: float = RATE_PER_DOMAIN):
+        self.workers       = workers
+        self.parse_workers = parse_workers
+        self.rate_limits   = {BS_HOST: rate}
+        self.seen_urls     = set()  # ← deduplication
+
+    def collect_links(self, ctx: CrawlContext):
+        print("Fetching Business Standard IPO page...")
+
+        resp = ctx.get(BASE_URL, timeout=20)
+
+        if resp.status_code != 200:
+            print("Blocked on main page, status:", resp.status_code)
+            return None
+
+        # canonical URL → (link as found, longest anchor text seen for it);
+        # the canonical form only decides what counts as the same page
+        found = {}
+
+        for href, text in extract_links(resp.content, resp.encoding):
+            if "ipo" in href.lower():
+                full_url = urljoin("https://www.business-standard.com", href)
+                # Only article links, skip section/nav links
+                if "/article/" in full_url or "/story/" in full_url or "/news/" in full_url:
+                    key = canonical_url(full_url)
+                    if key not in found or len(text) >= len(found[key][1]):
+                        found[key] = (full_url, text.strip())
+
+        anchors = dict(found[key] for key in sorted(found))   # link → anchor text
+
+        # Same headline under two different URLs → fetch it once
+        titles = TitleDeduper()
+        links  = {link for link in anchors if not titles.seen(anchors[link])}
+        if titles.dropped:
+            print(f"  Dropped {titles.dropped} links with near-identical headlines")
+
+        # Anchor text (or the URL slug) must pass the downstream IPO checks
+        if ctx.gate:
+            gate  = RelevanceGate(self.name)
+            links = {link for link in sorted(links) if gate.passes(anchors[link], url=link)}
+            print("  " + gate.summary())
+
+        return links
+
+    def _result(self, link: str, parse_future):
+        """(link, rows) once a link is settled, or None if it should be retried later."""
+        if parse_future is None:
+            return None
+        try:
+            row = parse_future.result()
+        except Exception as e:
+            print(f"  Failed to parse {link[:80]}: {e}")
+            return None
+
+        if row is None:
+            print(f"  Skipped (too short): {link[:80]}")
+            return link, []
+
+        self.seen_urls.add(link)
+        return link, [row]
+
+    def scrape_articles(self, ctx: CrawlContext, links: list):
+        """
+        Fetch on a thread pool, parse on a process pool, yield (link, rows).
+
+        Fetch workers hand each page to the parse executor and go straight back
+        to the network; the shared per-domain token bucket keeps us under the
+        rate cap. Results stream out as soon as they are ready, but always in
+        `links` order. Failed fetches yield nothing, so a resumed run retries them.
+        """
+        links = [link for link in links if link not in self.seen_urls]
+
+        fetch_pool = ThreadPoolExecutor(max_workers=min(self.workers, ctx.pool_size))
+        # spawn, not fork: this process already runs httpx/asyncio and fetch
+        # threads, and forking a threaded process can deadlock the children
+        parse_pool = (ProcessPoolExecutor(max_workers=self.parse_workers,
+                                          mp_context=multiprocessing.get_context("spawn"))
+                      if self.parse_workers > 0 else ThreadPoolExecutor(max_workers=1))
+        settled = {}  # link → parse future, or None if the fetch failed
+        head    = 0   # links[:head] have been yielded
+
+        try:
+            fetches = {
+                fetch_pool.submit(ctx.get, link, url_class="article", timeout=20): link
+                for link in links
+            }
+
+            for done, fut in enumerate(as_completed(fetches), start=1):
+                link = fetches[fut]
+                print(f"[{done}/{len(links)}] Fetched: {link[:80]}")
+                settled[link] = None
+                try:
+                    article_resp = fut.result()
+                except Exception as e:
+                    print(f"  Failed: {e}")
+                else:
+                    if article_resp.status_code != 200:
+                        print(f"  Skipped (status {article_resp.status_code})")
+                    else:
+                        settled[link] = parse_pool.submit(parse_article, link,
+                                                          article_resp.content,
+                                                          article_resp.encoding)
+
+                # Release every leading link whose result is already in hand
+                while head < len(links) and links[head] in settled:
+                    pending = settled[links[head]]
+                    if pending is not None and not pending.done():
+                        break
+                    result = self._result(links[head], settled.pop(links[head]))
+                    head += 1
+                    if result is not None:
+                        yield result
+
+            for link in links[head:]:
+                result = self._result(link, settled.pop(link, None))
+                if result is not None:
+                    yield result
+        finally:
+            fetch_pool.shutdown(wait=True, cancel_futures=True)
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+
+    def crawl(self, ctx: CrawlContext, done: set = frozenset()):
+        links = self.collect_links(ctx)
+        if links is None:
+            raise CrawlAborted("blocked on the IPO listing page")
+        print(f"Found {len(links)} candidate article links.")
+
+        if ctx.incremental:
+            before = len(links)
+            links  = {link for link in links if not ctx.is_stored(link)}
+            print(f"Incremental mode: {before - len(links)} already stored, {len(links)} new")
+
+        if done:
+            links = links - done
+            print(f"Resuming: {len(links)} links left to fetch")
+
+        yield from self.scrape_articles(ctx, sorted(links))
+
+
+def add_source_args(parser):
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS,
+                        help="concurrent fetch threads")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="processes for HTML parsing (0 = single parse thread)")
+    parser.add_argument("--bs-rate", type=float, default=RATE_PER_DOMAIN,
+                        help="requests/second allowed against Business Standard")
+    return parser
+
+
+def source_from_args(args) -> BusinessStandardSource:
+    return BusinessStandardSource(workers=args.workers, parse_workers=args.parse_workers,
+                                  rate=args.bs_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Business Standard IPO article scraper")
+    args = add_common_args(add_source_args(parser)).parse_args()
+    run_sources([source_from_args(args)], use_cache=not args.no_cache,
+                incremental=args.incremental, pool_size=args.pool_size,
+                restart=args.restart, chunk_rows=args.chunk_rows,
+                gate=not args.no_gate)
+
+
+if __name__ == "__main__":
+    main()
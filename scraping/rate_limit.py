@@ -0,0 +1,78 @@
+"""
+scraping/rate_limit.py
+
+Token-bucket rate limiting, one bucket per host.
+
+Each bucket refills at `rate` tokens/second up to `capacity`. Taking a token
+returns how long the caller has to wait for it, so the same bucket works for
+threads (time.sleep) and for asyncio tasks (asyncio.sleep).
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+from canonical import normalize_host
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate     = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens  = self.capacity
+        self._last    = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class HostRateLimiter:
+    """
+    Lazily creates one TokenBucket per host.
+    `overrides` maps host → requests/second for hosts that need a different cap.
+    Hosts are compared without case or a leading "www.", so "www.example.com"
+    and "example.com" share one bucket and one override.
+    """
+
+    def __init__(self, rate: float, capacity: float = None, overrides: dict = None):
+        self.rate      = rate
+        self.capacity  = capacity
+        self.overrides = {normalize_host(h): r for h, r in (overrides or {}).items()}
+        self._buckets  = {}
+        self._lock     = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        host = normalize_host(urlsplit(url).netloc)
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.overrides.get(host, self.rate)
+                self._buckets[host] = TokenBucket(rate, self.capacity)
+            return self._buckets[host]
+
+    def acquire(self, url: str):
+        self.bucket(url).acquire()
+
+    async def acquire_async(self, url: str):
+        await self.bucket(url).acquire_async()
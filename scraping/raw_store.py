@@ -0,0 +1,163 @@
+"""
+scraping/raw_store.py
+
+Helpers for writing scraper output to data/raw/: chunked append-only row
+writing plus the checkpoints that make an interrupted crawl resumable.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+
+def append_rows(rows: list, path: str) -> int:
+    """
+    Append rows to a raw CSV, creating it (with header) if missing.
+    New rows are aligned to the existing header so the file stays rectangular.
+    """
+    if not rows:
+        return 0
+
+    df = pd.DataFrame(rows)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        columns = pd.read_csv(path, nrows=0).columns.tolist()
+        extra = [c for c in df.columns if c not in columns]
+        if extra:
+            print(f"  Dropping columns not in {os.path.basename(path)}: {extra}")
+        df.reindex(columns=columns).to_csv(path, mode="a", header=False, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+    return len(df)
+
+
+def existing_urls(path: str) -> set:
+    """URLs already present in a raw CSV (used to dedup rows when resuming)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return set()
+    try:
+        urls = set()
+        for chunk in pd.read_csv(path, usecols=["url"], dtype=str, chunksize=50_000):
+            urls.update(chunk["url"].dropna())
+        return urls
+    except ValueError:
+        return set()
+
+
+class RowWriter:
+    """
+    Streams rows to a raw CSV in append-only chunks instead of holding the
+    whole crawl in memory. Work units (queries, article URLs...) passed with
+    their rows are reported to `on_flush` only after those rows are on disk,
+    so a checkpoint never gets ahead of the data.
+    """
+
+    def __init__(self, path: str, columns: list, append: bool = False,
+                 chunk_rows: int = 200, on_flush=None, skip_urls: set = None):
+        self.path         = path
+        self.columns      = columns
+        self.chunk_rows   = chunk_rows
+        self.on_flush     = on_flush
+        self.skip_urls    = skip_urls or set()
+        self.rows_written = 0
+        self._opened      = append
+        self._rows        = []
+        self._units       = []
+
+    def write(self, rows: list, unit: str = None):
+        for row in rows:
+            if row.get("url") in self.skip_urls:
+                continue
+            self.skip_urls.add(row.get("url"))
+            self._rows.append(row)
+        if unit is not None:
+            self._units.append(unit)
+        if len(self._rows) >= self.chunk_rows or len(self._units) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        rows, units = self._rows, self._units
+        self._rows, self._units = [], []
+
+        if rows:
+            if self._opened:
+                append_rows(rows, self.path)
+            else:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                pd.DataFrame(rows, columns=self.columns).to_csv(self.path, index=False)
+                self._opened = True
+            self.rows_written += len(rows)
+
+        if self.on_flush is not None and (rows or units):
+            self.on_flush(rows, units)
+
+    def close(self):
+        self.flush()
+        if not self._opened:
+            # Fresh run that produced nothing: still leave a valid, empty file
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+            self._opened = True
+
+
+CHECKPOINT_DIR = "data/cache/checkpoints"
+
+
+class Checkpoint:
+    """
+    Per-source crawl progress.
+
+    <name>.json   status ("running" / "complete") and start time
+    <name>.units  append-only log of finished work units, one per line
+    """
+
+    def __init__(self, name: str, checkpoint_dir: str = CHECKPOINT_DIR):
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        self.state_path = os.path.join(checkpoint_dir, f"{name}.json")
+        self.units_path = os.path.join(checkpoint_dir, f"{name}.units")
+        self.state = {}
+        self.done  = set()
+
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+        if os.path.exists(self.units_path):
+            with open(self.units_path, encoding="utf-8") as f:
+                self.done = {line.rstrip("\n") for line in f if line.strip()}
+
+    @property
+    def unfinished(self) -> bool:
+        return self.state.get("status") == "running"
+
+    def _save_state(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def start(self):
+        self.done  = set()
+        self.state = {"status": "running", "started_at": datetime.utcnow().isoformat()}
+        open(self.units_path, "w").close()
+        self._save_state()
+
+    def mark_done(self, units: list):
+        if not units:
+            return
+        with open(self.units_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{u}\n" for u in units)
+            f.flush()
+            os.fsync(f.fileno())
+        self.done.update(units)
+
+    def finish(self):
+        self.state["status"] = "complete"
+        self.state["finished_at"] = datetime.utcnow().isoformat()
+        self._save_state()
@@ -0,0 +1,77 @@
+"""
+scraping/relevance.py
+
+Pre-fetch relevance gate. Runs the checks the NLP stages apply later, taken
+from nlp/ipo_terms.py, on whatever a link already tells us: anchor text, RSS
+title/summary, or failing those the URL slug. A link passes when it has an
+IPO keyword (as ipo_filter requires) and names a company, either through
+the title patterns or as a known IPO (ipo_name_extractor tries both). Links
+that could never survive those stages are dropped before they are
+downloaded or stored, and the summary says which check dropped them.
+
+nlp/ must be importable: run the scrapers with PYTHONPATH=nlp (see README).
+"""
+
+import os
+import re
+from urllib.parse import urlsplit
+
+try:
+    from ipo_terms import NORMALIZE, extract_name, is_ipo_related, known_ipos
+except ModuleNotFoundError as e:
+    if e.name != "ipo_terms":
+        raise
+    raise ModuleNotFoundError("scraping shares nlp/ipo_terms.py with the NLP stages; "
+                              "run it with PYTHONPATH=nlp (see README)", name=e.name) from e
+
+_SLUG_SPLIT_RE = re.compile(r"[-_]+")
+_SLUG_ID_RE    = re.compile(r"\d+")
+
+
+def slug_title(url: str) -> str:
+    """'/markets/ipo/tata-capital-ipo-opens-1251003.html' → 'Tata Capital IPO Opens'."""
+    path = urlsplit(url).path.rstrip("/")
+    slug = os.path.splitext(path.rsplit("/", 1)[-1])[0]
+    words = [w for w in _SLUG_SPLIT_RE.split(slug) if w and not _SLUG_ID_RE.fullmatch(w)]
+    # Title-case so the name patterns can fire; "ipo" goes back to upper case
+    return " ".join("IPO" if w.lower() == "ipo" else w.capitalize() for w in words)
+
+
+class RelevanceGate:
+    """Counts what it rejects and why, so each source can report its skip rate."""
+
+    def __init__(self, name: str, discovered: list = None):
+        """`discovered`: known IPO names; defaults to the last discovery run's list."""
+        self.name     = name
+        self.known    = known_ipos(discovered)
+        self.checked  = 0
+        self.rejected = {"no IPO keyword": 0, "no company name": 0}
+
+    @property
+    def skipped(self) -> int:
+        return sum(self.rejected.values())
+
+    def names_company(self, title: str, text: str) -> bool:
+        name = extract_name(title)
+        if name is not None and NORMALIZE.get(name, name) is not None:
+            return True
+        return bool(self.known.find(text))
+
+    def passes(self, title: str = "", summary: str = "", url: str = "") -> bool:
+        self.checked += 1
+        title = (title or "").strip() or slug_title(url)
+        text  = f"{title} {summary or ''}"
+
+        if not is_ipo_related(text):
+            self.rejected["no IPO keyword"] += 1
+            return False
+        if not self.names_company(title, text):
+            self.rejected["no company name"] += 1
+            return False
+        return True
+
+    def summary(self) -> str:
+        rate    = self.skipped / self.checked if self.checked else 0.0
+        reasons = ", ".join(f"{n} {why}" for why, n in self.rejected.items())
+        return (f"[{self.name}] relevance gate: skipped {self.skipped}/{self.checked} "
+                f"links ({rate:.0%}: {reasons})")
@@ -0,0 +1,50 @@
+"""
+scraping/run_all.py
+
+Run several scraper sources at once on one shared session, cache and
+rate limiter. Each source writes data/raw/<its file>.csv in the unified
+RAW_COLUMNS schema.
+
+    python scraping/run_all.py                       # default sources
+    python scraping/run_all.py --sources google-news --incremental
+
+scraping/twitter.py is not a source: snscrape no longer works against X,
+so it stays the standalone dead-code script it was.
+"""
+
+import argparse
+
+import google_news
+import news
+from framework import add_common_args, run_sources
+
+SOURCES = {
+    "google-news":       google_news.source_from_args,
+    "business-standard": news.source_from_args,
+}
+
+DEFAULT_SOURCES = ["google-news", "business-standard"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run all GreySignal scrapers")
+    parser.add_argument("--sources", nargs="+", choices=sorted(SOURCES),
+                        default=DEFAULT_SOURCES, help="which sources to crawl")
+    google_news.add_source_args(parser)
+    news.add_source_args(parser)
+    args = add_common_args(parser).parse_args()
+
+    sources = [SOURCES[name](args) for name in args.sources]
+    results = run_sources(sources, use_cache=not args.no_cache,
+                          incremental=args.incremental, pool_size=args.pool_size,
+                          restart=args.restart, chunk_rows=args.chunk_rows,
+                          gate=not args.no_gate)
+
+    print(f"\n{'='*50}")
+    for name, count in results.items():
+        print(f"{name:<20} {count} rows")
+    print(f"{'='*50}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+scraping/url_index.py
+
+Persistent index of article URLs already written to data/raw/.
+Lets scrapers run incrementally: anything in the index is skipped.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+INDEX_PATH = "data/cache/url_index.sqlite"
+
+
+class UrlIndex:
+    def __init__(self, path: str = INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db   = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url        TEXT PRIMARY KEY,
+                source     TEXT,
+                first_seen TEXT
+            )
+        """)
+        self._db.commit()
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM urls WHERE url = ?", (url,)
+            ).fetchone() is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+    def add_many(self, urls, source: str):
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO urls VALUES (?, ?, ?)",
+                [(u, source, now) for u in urls],
+            )
+            self._db.commit()
+
+    def add(self, url: str, source: str):
+        self.add_many([url], source)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
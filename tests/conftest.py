@@ -0,0 +1,83 @@
+"""The stages run as scripts (`python nlp/x.py`), so put each package dir on sys.path."""
+
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for sub in ("nlp", "scraping"):
+    sys.path.insert(0, os.path.join(ROOT, sub))
+
+
+@pytest.fixture(scope="session")
+def cleaning():
+    """nlp/cleaning.py, with a small stopword list if the NLTK corpus isn't downloaded (offline)."""
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        stopwords.words("english")
+    except LookupError:
+        words = "i me my we our you it its the a an and is of to in for on with at by this that".split()
+        nltk.download = lambda *args, **kwargs: True
+        nltk.corpus.stopwords = types.SimpleNamespace(words=lambda lang: words)
+
+    import cleaning
+    return cleaning
+
+
+@pytest.fixture
+def sentiment(monkeypatch):
+    """nlp/sentiment.py without progress bars; skipped where torch/transformers aren't installed."""
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    import sentiment
+    monkeypatch.setattr(sentiment, "SHOW_PROGRESS", False)
+    return sentiment
+
+
+class StubTokenizer:
+    """Word-hash tokenizer with the calls sentiment.py makes of BertTokenizer."""
+
+    def _ids(self, text: str, max_length: int) -> list:
+        words = [sum(map(ord, w)) % 997 + 3 for w in text.split()]
+        return [1] + words[:max_length - 2] + [2]
+
+    def __call__(self, texts, return_tensors=None, truncation=False, padding=False,
+                 max_length=512):
+        ids = [self._ids(t, max_length) for t in texts]
+        features = [{"input_ids": i, "attention_mask": [1] * len(i)} for i in ids]
+        if padding:
+            return self.pad(features, return_tensors)
+        return {"input_ids": ids, "attention_mask": [f["attention_mask"] for f in features]}
+
+    def pad(self, features, return_tensors=None):
+        import torch
+        width = max(len(f["input_ids"]) for f in features)
+        return {k: torch.tensor([f[k] + [0] * (width - len(f[k])) for f in features])
+                for k in features[0]}
+
+
+class StubModel:
+    """Logits that depend only on a row's own unpadded ids; records every batch shape."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, input_ids, attention_mask):
+        import math
+        import torch
+        ids, mask = input_ids.tolist(), attention_mask.tolist()
+        self.batches.append((len(ids), len(ids[0])))
+        logits = []
+        for row, m in zip(ids, mask):
+            x = sum(i * k for i, k in zip(row, m)) / sum(m)
+            logits.append([math.sin(x), math.cos(x), math.sin(2 * x)])
+        return types.SimpleNamespace(logits=torch.tensor(logits, dtype=torch.float32))
+
+
+@pytest.fixture
+def stub_model():
+    """(tokenizer, model) stand-ins for FinBERT."""
+    return StubTokenizer(), StubModel()
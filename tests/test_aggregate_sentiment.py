@@ -0,0 +1,56 @@
+import random
+
+import pytest
+from rapidfuzz import fuzz_py, process_py
+
+import aggregate_sentiment
+from aggregate_sentiment import fuzzy_deduplicate, fuzzy_deduplicate_blocked
+
+REAL = ["Acme Robotics", "Acme Robotics Ltd", "ACME Robotics", "Robotics Acme", "Zeta Foods",
+        "Zeta Food", "Zeta Foods Limited", "Shree Ram Twistex", "Shree Ram", "Clean Max Enviro",
+        "CleanMax Enviro Energy", "Iron & Steel", "Madhur Iron & Steel", "PhonePe", "Phone Pe"]
+
+# rapidfuzz does not split on all of these in every scorer and string width
+SPACES = [" ", " ", " ", "\xa0", "\x85", " ", "\x1c", "\t"]
+PIECES = ["Acme", "Robotics", "Zeta", "Foods", "acme", "Ltd", "&", "Pe", "é", "ā",
+          "\U0001F600"] + SPACES
+
+
+def random_names(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    names = {"".join(rng.choice(PIECES) for _ in range(rng.randint(1, 7))) for _ in range(n)}
+    names = sorted(names)
+    rng.shuffle(names)
+    return REAL + names
+
+
+@pytest.fixture(params=["cpp", "python"])
+def scorer_backend(request, monkeypatch):
+    """Run both sides on rapidfuzz's C++ scorers (default) or its pure-Python ones."""
+    if request.param == "python":
+        monkeypatch.setattr(aggregate_sentiment, "fuzz", fuzz_py)
+        monkeypatch.setattr(aggregate_sentiment, "process", process_py)
+    return request.param
+
+
+@pytest.mark.parametrize("threshold", [60, 75, 88, 95, 100])
+def test_blocked_matches_legacy(scorer_backend, threshold):
+    names = random_names(150, seed=threshold)
+    legacy = fuzzy_deduplicate(names, threshold)
+    for chunk in (7, 1000):
+        assert fuzzy_deduplicate_blocked(names, threshold, chunk=chunk) == legacy
+
+
+def test_odd_whitespace_clusters_like_legacy(scorer_backend):
+    names = ["Zeta\xa0Foods", "Foods Zeta", "Zeta Foods", "Zeta\x85Foodsā",
+             "Foods\x1cZeta", "Zeta Foods", "\xa0", " ", " "]
+    for threshold in (50, 88, 100):
+        assert fuzzy_deduplicate_blocked(names, threshold, chunk=2) == \
+            fuzzy_deduplicate(names, threshold)
+
+
+def test_real_names_cluster():
+    fuzzy_map = fuzzy_deduplicate_blocked(REAL, 88)
+    assert fuzzy_map["ACME Robotics"] == fuzzy_map["Robotics Acme"] == "Acme Robotics"
+    assert fuzzy_map["Zeta Foods"] == "Zeta Food"
+    assert fuzzy_map["Zeta Foods Limited"] == "Zeta Foods Limited"
@@ -0,0 +1,28 @@
+import random
+
+import numpy as np
+
+VOCAB = ["IPO", "ipo's", "the", "The", "GMP:", "₹1,200", "Rs.500", "https://x.com/a?b=1",
+         "(http://t.co/z)", "DRHP-filed", "café", "naïve", "—", "...", "SEBI's", "and/or",
+         "2026", "x1", "is", "A", "subscription!!", "Zeta Foods", " ", "e-mail"]
+
+
+def random_texts(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    seps = [" ", "  ", "\t", "\n", " \r\n "]
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(VOCAB) for _ in range(rng.randint(0, 25))]
+        texts.append("".join(w + rng.choice(seps) for w in words))
+    return texts + ["", "   ", None, np.nan, 12345]
+
+
+def test_clean_texts_matches_clean_text(cleaning):
+    texts = random_texts(2000)
+    assert cleaning.clean_texts(texts) == [cleaning.clean_text(t) for t in texts]
+
+
+def test_word_memo_reset_keeps_output(cleaning, monkeypatch):
+    monkeypatch.setattr(cleaning, "WORD_CACHE_SIZE", 5)
+    texts = random_texts(300, seed=1)
+    assert cleaning.clean_texts(texts) == [cleaning.clean_text(t) for t in texts]
@@ -0,0 +1,29 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from html_extract import extract_article, extract_links
+
+PAGES = [
+    b"<p>x<script>var a = 1;</script>y</p>",
+    b"<p>a <b>bold</b><!-- note -->tail<style>p {}</style> end</p>",
+    b"<p>Acme <i>Robotics</i>\n IPO <script>track()</script><span>opens</span> today</p>",
+]
+
+
+@pytest.mark.parametrize("html", PAGES)
+def test_paragraph_text_matches_bs4(html):
+    expected = BeautifulSoup(html, "html.parser").find("p").get_text(" ", strip=True)
+    assert extract_article(html)["paragraphs"] == [expected]
+
+
+@pytest.mark.parametrize("html", [p.replace(b"<p>", b"<h1>").replace(b"</p>", b"</h1>")
+                                  for p in PAGES])
+def test_title_text_matches_bs4(html):
+    expected = BeautifulSoup(html, "html.parser").find("h1").get_text(strip=True)
+    assert extract_article(html)["title"] == expected
+
+
+def test_anchor_text_matches_bs4():
+    html = b'<a href="/ipo/acme">Acme<script>x()</script> IPO</a>'
+    a = BeautifulSoup(html, "html.parser").find("a")
+    assert extract_links(html) == [(a["href"], a.get_text(strip=True))]
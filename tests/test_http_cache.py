@@ -0,0 +1,49 @@
+import pytest
+import requests
+
+from http_cache import HttpCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code       = status_code
+        self.content           = content
+        self.headers           = headers or {}
+        self.encoding          = "utf-8"
+        self.apparent_encoding = "utf-8"
+
+
+class FakeSession:
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls   = []
+
+    def get(self, url, headers=None, **kwargs):
+        self.calls.append(headers or {})
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+URL = "https://example.com/rss/feed.xml"
+
+
+def test_stale_copy_served_when_revalidation_fails(tmp_path):
+    cache   = HttpCache(str(tmp_path), ttls={"rss": 0})
+    session = FakeSession(FakeResponse(200, b"<rss/>", {"ETag": '"v1"'}),
+                          requests.ConnectionError("network down"))
+
+    assert cache.get(session, URL).text == "<rss/>"
+    resp = cache.get(session, URL)
+
+    assert resp.text == "<rss/>" and resp.from_cache
+    assert session.calls[1]["If-None-Match"] == '"v1"'
+    assert cache.stale_served == 1
+
+
+def test_network_error_without_cached_copy_propagates(tmp_path):
+    cache   = HttpCache(str(tmp_path))
+    session = FakeSession(requests.Timeout("slow"))
+    with pytest.raises(requests.Timeout):
+        cache.get(session, URL)
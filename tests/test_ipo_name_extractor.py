@@ -0,0 +1,41 @@
+from ipo_terms import JUNK_NAMES, MANUAL_NORMALIZE
+from gazetteer import Gazetteer
+from ipo_name_extractor import NORMALIZE, tag_batch
+
+ALIAS_MAPS = [NORMALIZE, MANUAL_NORMALIZE]
+BODY = ("Shares of the company will list on the National Stock Exchange and "
+        "BSE next week. Zeta Foods Limited also opens its issue on Monday.")
+
+
+def gazetteer(discovered):
+    return Gazetteer.from_sources(discovered, ALIAS_MAPS, junk=JUNK_NAMES)
+
+
+def test_alias_maps_alone_add_nothing():
+    gaz = gazetteer([])
+    assert gaz.names == set()
+    assert gaz.find(BODY) == []
+
+
+def test_exchange_and_junk_names_are_never_tagged():
+    gaz = gazetteer(["National Stock Exchange", "NSE", "Plans", "Zeta Foods Limited"])
+    assert gaz.names == {"Zeta Foods"}
+
+
+def test_title_regex_beats_exchange_in_body():
+    gaz = gazetteer(["Zeta Foods Limited"])
+    [(primary, _, tagger)] = tag_batch([("Acme Robotics IPO opens today", BODY)], gaz)
+    assert (primary, tagger) == ("Acme Robotics", "regex")
+
+
+def test_body_hit_used_only_when_title_names_nothing():
+    gaz = gazetteer(["Zeta Foods Limited"])
+    [(primary, mentions, tagger)] = tag_batch([("Three issues open this week", BODY)], gaz)
+    assert (primary, tagger) == ("Zeta Foods", "gazetteer")
+    assert [name for name, _, _ in mentions] == ["Zeta Foods"]
+
+
+def test_known_name_in_title_wins():
+    gaz = gazetteer(["Zeta Foods Limited"])
+    [(primary, _, tagger)] = tag_batch([("Zeta Foods IPO: GMP rises", BODY)], gaz)
+    assert (primary, tagger) == ("Zeta Foods", "gazetteer")
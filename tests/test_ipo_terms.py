@@ -0,0 +1,85 @@
+import random
+import re
+
+import pytest
+
+from ipo_terms import (PATTERNS, extract_batch, extract_mentions, extract_name,
+                       is_valid_ipo_name, pattern_matches)
+
+NAME_WORDS = ["Acme", "Robotics", "Zeta", "Foods", "Ltd", "India", "SME", "The", "Iron", "&",
+              "Steel", "PhonePe", "Clean", "Max", "Shree", "Ram", "Twistex", "Plans", "GMP", "Rs"]
+TRIGGERS   = ["IPO", "IPO of", "files DRHP", "Files dRHP", "gets Sebi nod", "Gets SEBI Nod",
+              "secures SEBI", "Receives SEBI", "public issue", "Launches IPO", "to raise",
+              "lists on", "Prepares for IPO", "ipo", "files", "gets", "x"]
+FILLER     = ["opens", "today", "on", "of", ":", ",", "-", "crore", "500", "after", "and"]
+
+TITLES = [
+    "Acme Robotics IPO opens today",
+    "IPO of Zeta Foods Ltd subscribed 3 times",
+    "PhonePe files DRHP with SEBI; Meesho Gets Sebi Nod",
+    "Iron & Steel Gets SEBI nod, Clean Max Enviro Energy to raise Rs 500 crore",
+    "Upcoming IPO: Shree Ram Twistex Lists On NSE after Acme Prepares for IPO",
+    "no names here at all",
+    "",
+]
+
+
+def random_titles(n: int, seed: int) -> list:
+    """Runs of capitalised words around pattern triggers, with filler between them."""
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.randint(1, 3)):
+            parts += rng.choices(NAME_WORDS, k=rng.randint(0, 6)) + [rng.choice(TRIGGERS)]
+            parts += rng.choices(NAME_WORDS + FILLER, k=rng.randint(0, 3))
+        titles.append(" ".join(parts))
+    return titles
+
+
+def per_pattern_matches(text: str) -> list:
+    """Reference for pattern_matches(): every pattern tried at every offset."""
+    found = []
+    for pos in range(len(text) + 1):
+        for i, pat in enumerate(PATTERNS):
+            m = re.compile(pat).match(text, pos)
+            if m:
+                found.append((i, pos) + m.span("name"))
+    return found
+
+
+def legacy_extract_name(text):
+    """The original extractor: each pattern in turn, first valid name wins."""
+    if not isinstance(text, str):
+        return None
+    for pat in PATTERNS:
+        m = re.search(pat, text)
+        if m:
+            candidate = m.group("name").strip()
+            if is_valid_ipo_name(candidate):
+                return candidate
+    return None
+
+
+CORPUS = TITLES + random_titles(2000, seed=11)
+
+
+@pytest.mark.parametrize("text", TITLES)
+def test_combined_scan_finds_every_pattern_match(text):
+    assert pattern_matches(text) == per_pattern_matches(text)
+
+
+def test_combined_scan_matches_per_pattern_loop_on_random_titles():
+    for text in random_titles(300, seed=3):
+        assert pattern_matches(text) == per_pattern_matches(text), text
+
+
+def test_extract_name_matches_legacy_loop():
+    for text in CORPUS + [None, float("nan")]:
+        assert extract_name(text) == legacy_extract_name(text), text
+
+
+def test_extract_batch_matches_single_calls():
+    batch = extract_batch(CORPUS + [None])
+    assert [primary for primary, _ in batch] == [legacy_extract_name(t) for t in CORPUS + [None]]
+    assert [mentions for _, mentions in batch] == [extract_mentions(t) for t in CORPUS + [None]]
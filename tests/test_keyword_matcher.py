@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from ipo_terms import KEYWORDS
+from keyword_matcher import KeywordMatcher
+
+pytest.importorskip("ahocorasick")
+
+# Keywords that start, end or sit inside one another
+OVERLAPPING = ["drhp", "rhp", "hp", "ipo", "ipos", "po", "anchor", "anchor investor",
+               "investor", "sme ipo", "e i", "a"]
+
+PIECES = OVERLAPPING + list(KEYWORDS) + ["d", "r", "x", "1", "é", " ", " ", "-", ".", "\n",
+                                         "IPO", "drhpx"]
+
+
+def random_texts(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(PIECES) for _ in range(rng.randint(0, 25))) for _ in range(n)]
+
+
+TEXTS = random_texts(500, seed=7) + [
+    "", "drhp", "sme ipos filed a drhp and an rhp", "anchor investors", "ipo-bound", "xdrhpx",
+]
+
+
+@pytest.mark.parametrize("keywords", [OVERLAPPING, sorted(KEYWORDS), []],
+                         ids=["overlapping", "ipo_terms", "empty"])
+@pytest.mark.parametrize("word_boundary", [False, True])
+def test_backends_agree(keywords, word_boundary):
+    aho   = KeywordMatcher(keywords, word_boundary, backend="pyahocorasick")
+    regex = KeywordMatcher(keywords, word_boundary, backend="regex")
+    for text in TEXTS:
+        assert aho.find(text) == regex.find(text), text
+        assert aho.contains(text) == regex.contains(text), text
+
+
+def test_overlaps_and_boundaries():
+    text = "the drhp and rhp"
+    assert KeywordMatcher(["drhp", "rhp", "hp"], backend="regex").find(text) == [
+        (4, "drhp"), (5, "rhp"), (6, "hp"), (13, "rhp"), (14, "hp")]
+    for backend in ("pyahocorasick", "regex"):
+        bounded = KeywordMatcher(["drhp", "rhp", "hp"], word_boundary=True, backend=backend)
+        assert bounded.find(text) == [(4, "drhp"), (13, "rhp")]
+        assert not bounded.contains("xdrhpx")
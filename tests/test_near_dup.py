@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from near_dup import (NUM_PERM, MinHasher, cluster_signatures, load_signatures, lsh_params,
+                      save_signatures)
+
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.8, 0.9])
+def test_lsh_params_fit_signature_and_threshold(threshold):
+    bands, rows = lsh_params(threshold, NUM_PERM)
+    assert bands * rows <= NUM_PERM
+    # The banding S-curve turns at ~(1/bands)^(1/rows); it should sit near the threshold
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.1
+
+
+def test_lsh_params_stricter_threshold_uses_longer_bands():
+    rows = [lsh_params(t, NUM_PERM)[1] for t in (0.5, 0.7, 0.8, 0.9)]
+    assert rows == sorted(rows)
+
+
+def test_syndicated_copies_cluster_under_first_row():
+    story = ("sebi approves the drhp of acme industries for an initial public offering "
+             "of equity shares with a fresh issue and an offer for sale by promoters ")
+    texts = [
+        "unrelated note about monsoon rainfall and crop sowing across several states this week",
+        story + "reported by staff",
+        "",
+        story + "reported by agency",
+    ]
+    sigs, valid = MinHasher().signatures(texts)
+    cluster_id, cluster_size = cluster_signatures(sigs, valid, 0.8)
+
+    assert valid.tolist() == [True, True, False, True]
+    assert cluster_id.tolist() == [0, 1, 2, 1]
+    assert cluster_size.tolist() == [1, 2, 1, 2]
+
+
+def test_bucket_members_compared_pairwise():
+    # A ~ B and B ~ C above the threshold, A ~ C below it, all three in one
+    # bucket of every band they share: C must still join through B
+    bands, rows = lsh_params(0.8, NUM_PERM)
+    rng = np.random.default_rng(0)
+    a = rng.integers(0, 2**32 - 1, NUM_PERM, dtype=np.uint64).astype(np.uint32)
+    shared = 4 * rows
+    b, c = a.copy(), a.copy()
+    b[shared + np.arange(19) * 3] += 1          # 19 slots differ between A and B
+    c[:] = b
+    c[shared + 1 + np.arange(19) * 3] += 1      # 19 more between B and C
+    assert shared + 1 + 18 * 3 < bands * rows   # every diff lands inside a band
+
+    sigs = np.stack([a, b, c])
+    agree = lambda x, y: (sigs[x] == sigs[y]).mean()
+    assert agree(0, 1) >= 0.8 and agree(1, 2) >= 0.8 and agree(0, 2) < 0.8
+
+    cluster_id, cluster_size = cluster_signatures(sigs, threshold=0.8)
+    assert cluster_id.tolist() == [0, 0, 0]
+    assert cluster_size.tolist() == [3, 3, 3]
+
+
+def test_empty_input():
+    cluster_id, cluster_size = cluster_signatures(np.zeros((0, NUM_PERM), dtype=np.uint32))
+    assert len(cluster_id) == len(cluster_size) == 0
+
+
+def test_signature_cache_round_trip(tmp_path):
+    path  = str(tmp_path / "cache" / "sigs.npz")
+    sigs, valid = MinHasher().signatures(["first cleaned text here", "", "second one"])
+    save_signatures(path, ["h1", "h2", "h3"], sigs, valid)
+
+    loaded = load_signatures(path)
+    assert list(loaded) == ["h1", "h2", "h3"]
+    for i, key in enumerate(loaded):
+        sig, ok = loaded[key]
+        assert sig.dtype == np.uint32
+        assert np.array_equal(sig, sigs[i])
+        assert ok == valid[i]
+
+
+def test_missing_signature_cache_is_empty(tmp_path):
+    assert load_signatures(str(tmp_path / "missing.npz")) == {}
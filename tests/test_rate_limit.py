@@ -0,0 +1,10 @@
+from rate_limit import HostRateLimiter
+
+
+def test_override_matches_host_with_or_without_www():
+    limiter = HostRateLimiter(2.0, overrides={"www.business-standard.com": 0.5})
+
+    bucket = limiter.bucket("https://www.business-standard.com/markets/ipos")
+    assert bucket.rate == 0.5
+    assert limiter.bucket("https://business-standard.com/article/x.html") is bucket
+    assert limiter.bucket("https://news.google.com/rss/search?q=ipo").rate == 2.0
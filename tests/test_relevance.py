@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from relevance import RelevanceGate
+
+
+def test_gate_imports_no_nlp_stage():
+    code = ("import sys, relevance; "
+            "print(sorted({'pandas', 'rapidfuzz', 'aggregate_sentiment', 'ipo_filter', "
+            "'ipo_name_extractor'} & set(sys.modules)))")
+    env = {**os.environ, "PYTHONPATH": os.path.join(ROOT, "nlp")}
+    out = subprocess.run([sys.executable, "-c", code], cwd=os.path.join(ROOT, "scraping"),
+                         env=env, capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
+
+
+def test_known_ipo_in_summary_passes_without_a_title_name():
+    gate = RelevanceGate("test", discovered=["Zeta Foods Limited"])
+    assert gate.passes("Three issues open this week", "Zeta Foods IPO subscribed 3 times")
+    assert gate.passes("Acme Robotics IPO opens today")
+
+
+def test_rejections_are_counted_per_check():
+    gate = RelevanceGate("test", discovered=[])
+    assert not gate.passes("Markets rally on Monday")
+    assert not gate.passes("IPO market sees a record week")
+    assert gate.rejected == {"no IPO keyword": 1, "no company name": 1}
+    assert "1 no IPO keyword, 1 no company name" in gate.summary()
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+import score_cache
+from score_cache import ScoreCache, score_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ScoreCache(str(tmp_path / "cache" / "scores.sqlite"))
+    yield cache
+    cache.close()
+
+
+def test_key_depends_on_text_model_and_max_length():
+    base = score_key("Acme IPO opens", "ProsusAI/finbert", 512)
+    assert base == score_key("Acme IPO opens", "ProsusAI/finbert", 512)
+    assert base != score_key("Acme IPO opens.", "ProsusAI/finbert", 512)
+    assert base != score_key("Acme IPO opens", "ProsusAI/finbert#int8", 512)
+    assert base != score_key("Acme IPO opens", "ProsusAI/finbert", 256)
+
+
+def test_round_trip_and_hit_counts(cache):
+    probs = np.array([[0.7, 0.1, 0.2], [0.05, 0.9, 0.05]], dtype=np.float32)
+    keys  = [score_key(t, "m", 512) for t in ("first", "second", "third")]
+    cache.store_many("m", list(zip(keys[:2], probs)))
+
+    found = cache.lookup_many(keys + keys[:1])
+    assert set(found) == set(keys[:2])
+    np.testing.assert_array_equal(np.array([found[k] for k in keys[:2]], dtype=np.float32), probs)
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert len(cache) == 2
+    assert cache.summary().startswith("score cache: 3/4 hits (75.0%), 2 entries")
+
+
+def test_entries_persist_across_runs(tmp_path):
+    path = str(tmp_path / "scores.sqlite")
+    first = ScoreCache(path)
+    first.store_many("m", [(b"k", (0.2, 0.3, 0.5))])
+    first.close()
+
+    again = ScoreCache(path)
+    assert again.lookup_many([b"k"]) == {b"k": (0.2, 0.3, 0.5)}
+    again.close()
+
+
+def test_prune_by_model_and_idle_time(cache, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr(score_cache.time, "time", lambda: now - 10 * 86400)
+    cache.store_many("old", [(b"a", (1, 0, 0)), (b"b", (0, 1, 0))])
+    monkeypatch.setattr(score_cache.time, "time", lambda: now)
+    cache.store_many("new", [(b"c", (0, 0, 1))])
+    cache.lookup_many([b"b"])   # a hit refreshes used_at
+
+    assert cache.prune(max_idle_days=5) == 1
+    assert set(cache.lookup_many([b"a", b"b", b"c"])) == {b"b", b"c"}
+    assert cache.prune(keep_model="new") == 1
+    assert len(cache) == 1
+
+
+# ── Through sentiment.score_probs ────────────────────────────────────────────
+TEXTS = ["Acme IPO subscribed 40 times on the final day",
+         "Zeta Foods files DRHP with SEBI",
+         "Acme IPO subscribed 40 times on the final day",
+         "   "]
+
+
+def test_second_run_is_served_from_cache(sentiment, stub_model, cache):
+    tokenizer, model = stub_model
+    first = sentiment.score_probs(TEXTS, tokenizer, model, cache=cache)
+    scored = len(model.batches)
+    assert scored and (cache.hits, cache.misses) == (0, 4)
+    assert len(cache) == 3   # the repeated text is scored and stored once
+
+    again = sentiment.score_probs(TEXTS, tokenizer, model, cache=cache)
+    assert len(model.batches) == scored
+    assert (cache.hits, cache.misses) == (4, 4)
+    np.testing.assert_array_equal(again, first)
+    np.testing.assert_allclose(first, sentiment.score_probs(TEXTS, tokenizer, model),
+                               rtol=1e-6)
+
+
+@pytest.mark.parametrize("change", ["max_length", "backend"])
+def test_model_or_max_length_change_misses(sentiment, stub_model, cache, monkeypatch, change):
+    tokenizer, model = stub_model
+    sentiment.score_probs(TEXTS, tokenizer, model, cache=cache)
+    scored = len(model.batches)
+
+    kwargs = {}
+    if change == "max_length":
+        monkeypatch.setattr(sentiment, "MAX_LENGTH", 128)
+    else:
+        kwargs["backend"] = "int8"
+    sentiment.score_probs(TEXTS, tokenizer, model, cache=cache, **kwargs)
+
+    assert len(model.batches) > scored
+    assert (cache.hits, cache.misses) == (0, 8)
+    assert len(cache) == 6
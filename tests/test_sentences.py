@@ -0,0 +1,34 @@
+from sentences import article_sentences, split_sentences, strip_html
+
+GNEWS_SUMMARY = ('<a href="https://news.google.com/rss/articles/CBMi?oc=5" target="_blank">'
+                 'Acme Robotics IPO subscribed 12 times on day two</a>&nbsp;&nbsp;'
+                 '<font color="#6f6f6f">Business Standard</font>')
+DISCLAIMER    = "Disclaimer: The views and investment tips expressed here are their own."
+
+
+def test_rss_summary_markup_is_not_scored():
+    sentences = split_sentences(GNEWS_SUMMARY)
+    assert sentences == ["Acme Robotics IPO subscribed 12 times on day two Business Standard"]
+    assert not any("<" in s or "href" in s or "&nbsp;" in s for s in sentences)
+
+
+def test_block_tags_split_sentences():
+    text = "<p>Shares of Acme Robotics rose 5% to Rs. 500 on Monday</p><p>The issue closes on Friday evening.</p>"
+    assert split_sentences(text) == ["Shares of Acme Robotics rose 5% to Rs. 500 on Monday",
+                                     "The issue closes on Friday evening."]
+    assert strip_html("plain text, no markup") == "plain text, no markup"
+
+
+def test_incremental_boilerplate_matches_full_run():
+    corpus = [f"Company {i} IPO opens today for subscription. {DISCLAIMER}" for i in range(4)]
+    full   = article_sentences(corpus, min_articles=3)
+    new    = article_sentences(corpus[3:], min_articles=3, corpus=corpus)
+
+    assert new == full[3:] == [["Company 3 IPO opens today for subscription."]]
+    # Counted over the new rows alone, the disclaimer would not look like boilerplate
+    assert DISCLAIMER in article_sentences(corpus[3:], min_articles=3)[0]
+
+
+def test_all_boilerplate_article_keeps_its_text():
+    corpus = [DISCLAIMER] * 3
+    assert article_sentences(corpus, min_articles=2) == [[DISCLAIMER]] * 3
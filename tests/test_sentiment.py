@@ -0,0 +1,118 @@
+import random
+
+import numpy as np
+import pytest
+
+WORDS = "ipo sebi drhp listing gains subscribed anchor issue price band grey market".split()
+
+
+def random_texts(n: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(WORDS, k=rng.choice([1, 2, 5, 20, 80, 300])))
+            for _ in range(n)]
+
+
+def one_by_one(sentiment, texts, tokenizer, model) -> np.ndarray:
+    return np.concatenate([sentiment.score_batch([t], tokenizer, model) for t in texts])
+
+
+# ── Length batching ──────────────────────────────────────────────────────────
+@pytest.mark.parametrize("budget, max_batch", [(64, 4), (512, 64), (10, 8)])
+def test_length_batches_cover_every_row_once(sentiment, budget, max_batch):
+    lengths = [random.Random(i).randint(1, 40) for i in range(200)]
+    batches = sentiment.length_batches(lengths, budget, max_batch)
+
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    flat = [lengths[i] for b in batches for i in b]
+    assert flat == sorted(flat)
+    for b in batches:
+        assert len(b) <= max_batch
+        assert len(b) == 1 or len(b) * max(lengths[i] for i in b) <= budget
+
+
+def test_length_batching_restores_input_order(sentiment, stub_model):
+    tokenizer, model = stub_model
+    texts = random_texts(150, seed=1)
+    probs = sentiment.score_length_batched(texts, tokenizer, model, token_budget=256,
+                                           max_batch=8)
+    batches = list(model.batches)
+
+    assert probs.shape == (len(texts), 3)
+    np.testing.assert_allclose(probs, one_by_one(sentiment, texts, tokenizer, model),
+                               rtol=1e-5, atol=1e-6)
+    # Rows really were regrouped, each batch padded only to its own longest row
+    assert len(batches) > len(texts) // 8
+    assert all(rows == 1 or rows * width <= 256 for rows, width in batches)
+
+
+def test_length_and_fixed_batching_agree(sentiment, stub_model):
+    tokenizer, model = stub_model
+    texts = random_texts(60, seed=2)
+    length = sentiment.score_texts(texts, tokenizer, model, "length")
+    fixed  = sentiment.score_texts(texts, tokenizer, model, "fixed")
+    np.testing.assert_allclose(length, np.asarray(fixed), rtol=1e-5, atol=1e-6)
+
+
+# ── Article and sentence scoring, every batching/cache combination ──────────
+ARTICLES = [
+    "<p>Acme Robotics IPO was subscribed 40 times on the final day.</p>"
+    "<p>Grey market premium rose to Rs 120 ahead of listing.</p>",
+    "Zeta Foods files DRHP with SEBI for a fresh issue. "
+    "Grey market premium rose to Rs 120 ahead of listing.",
+    "",
+    None,
+    "Short.",
+]
+
+
+@pytest.fixture(params=[(b, c) for b in ("length", "fixed") for c in (False, True)],
+                ids=lambda p: f"{p[0]}-{'cache' if p[1] else 'nocache'}")
+def score_kwargs(request, tmp_path):
+    batching, use_cache = request.param
+    if not use_cache:
+        yield {"batching": batching}
+        return
+    from score_cache import ScoreCache
+    cache = ScoreCache(str(tmp_path / "scores.sqlite"))
+    yield {"batching": batching, "cache": cache}
+    cache.close()
+
+
+def test_fixed_batches_return_an_array(sentiment, stub_model):
+    tokenizer, model = stub_model
+    probs = sentiment.score_fixed_batches(random_texts(11, seed=3), tokenizer, model)
+    assert isinstance(probs, np.ndarray) and probs.shape == (11, 3)
+    assert sentiment.score_fixed_batches([], tokenizer, model).shape == (0, 3)
+
+
+def test_score_dataframe(sentiment, stub_model, score_kwargs):
+    import pandas as pd
+    tokenizer, model = stub_model
+    df  = pd.DataFrame({"text": ARTICLES})
+    out = sentiment.score_dataframe(df, tokenizer, model, "text", **score_kwargs)
+
+    texts = [t if isinstance(t, str) and t.strip() else "no text" for t in ARTICLES]
+    expected = one_by_one(sentiment, texts, tokenizer, model)
+    np.testing.assert_allclose(out["sentiment_positive"], expected[:, 0].round(4), atol=1e-4)
+    np.testing.assert_allclose(out["sentiment_score"],
+                               (expected[:, 0] - expected[:, 1]).round(4), atol=1e-4)
+
+
+def test_score_sentences(sentiment, stub_model, score_kwargs):
+    import pandas as pd
+    from sentences import article_sentences
+    tokenizer, model = stub_model
+    df  = pd.DataFrame({"text": ARTICLES})
+    out = sentiment.score_sentences(df, tokenizer, model, "text", "length", **score_kwargs)
+
+    articles = article_sentences(df["text"].fillna("").tolist())
+    assert out["sentence_count"].tolist() == [len(s) for s in articles]
+    assert articles[0] == ["Acme Robotics IPO was subscribed 40 times on the final day.",
+                           "Grey market premium rose to Rs 120 ahead of listing."]
+    for row, sents in zip(out.itertuples(), articles):
+        texts = [s if s.strip() else "no text" for s in sents]
+        p = one_by_one(sentiment, texts, tokenizer, model)
+        w = np.array([max(len(s), 1) for s in sents], dtype=np.float64)
+        pos, neg = (p[:, :2] * w[:, None]).sum(axis=0) / w.sum()
+        assert row.sentiment_positive == pytest.approx(round(pos, 4), abs=1e-4)
+        assert row.sentiment_score == pytest.approx(round(pos - neg, 4), abs=1e-4)
@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+
+import storage
+
+
+@pytest.fixture
+def parquet_run(monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(storage, "FORMAT", "parquet")
+    monkeypatch.setattr(storage, "_warned", set())
+
+
+def _write_both(tmp_path, csv_age: float, parquet_age: float) -> str:
+    path = str(tmp_path / "stage.csv")
+    pd.DataFrame({"v": ["csv"]}).to_csv(path, index=False)
+    storage.write_table(pd.DataFrame({"v": ["parquet"]}), path)
+    now = os.path.getmtime(path)
+    os.utime(path, (now - csv_age, now - csv_age))
+    os.utime(storage.path_for(path, "parquet"), (now - parquet_age, now - parquet_age))
+    return path
+
+
+def test_newer_file_wins_over_run_format(tmp_path, parquet_run, capsys):
+    path = _write_both(tmp_path, csv_age=0, parquet_age=60)
+    assert storage.read_table(path)["v"].tolist() == ["csv"]
+    assert "Reading" in capsys.readouterr().out
+
+
+def test_stale_other_format_is_ignored(tmp_path, parquet_run, capsys):
+    path = _write_both(tmp_path, csv_age=60, parquet_age=0)
+    assert storage.read_table(path)["v"].tolist() == ["parquet"]
+    assert capsys.readouterr().out == ""
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_int_columns_survive_concat_with_older_rows(tmp_path, monkeypatch, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(storage, "FORMAT", fmt)
+    path = str(tmp_path / "all_news_clean.csv")
+
+    # Output written before the column existed, then new rows that carry it
+    storage.write_table(pd.DataFrame({"row_hash": ["a", "b"]}), path)
+    new = pd.DataFrame({"row_hash": ["c"], "dup_cluster_size": [3], "keyword_hits": ["2"]})
+    merged = pd.concat([storage.read_table(path), new], ignore_index=True)
+    assert merged["dup_cluster_size"].dtype == float
+
+    storage.write_table(merged, path)
+    again = storage.read_table(path)
+    assert again["dup_cluster_size"].isna().tolist() == [True, True, False]
+    assert again["dup_cluster_size"].iloc[2] == 3
+    assert again["keyword_hits"].iloc[2] == 2
+
+    # And once more, on top of a file that already has NaNs in the column
+    more = pd.DataFrame({"row_hash": ["d"], "dup_cluster_size": [1], "keyword_hits": [0]})
+    storage.write_table(pd.concat([again, more], ignore_index=True), path)
+    assert storage.read_table(path)["dup_cluster_size"].tolist()[2:] == [3, 1]
+
+
+def test_table_writer_casts_string_chunks(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    path = str(tmp_path / "stream.csv")
+    out  = storage.TableWriter(path, ["row_hash", "dup_cluster_size"], "parquet")
+    out.write(pd.DataFrame({"row_hash": ["a", "b"], "dup_cluster_size": ["2", ""]}))
+    out.close()
+
+    monkeypatch.setattr(storage, "FORMAT", "parquet")
+    sizes = storage.read_table(path)["dup_cluster_size"]
+    assert sizes.iloc[0] == 2 and pd.isna(sizes.iloc[1])